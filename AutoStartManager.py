@@ -1,91 +1,305 @@
 import sys
 import os
-import platform
+import atexit
+import functools
+import threading
+
+# 运行期间操作系统不会变化，导入时判断一次即可
+_IS_WINDOWS = sys.platform == "win32"
+
+if _IS_WINDOWS:
+    import winreg
+    import ctypes
+    from ctypes import wintypes
+    
+    # winreg.QueryValueEx 总会读取并解码数据，只判断存在性时直接调用 Win32 API
+    _RegQueryValueExW = ctypes.WinDLL('advapi32').RegQueryValueExW
+    _RegQueryValueExW.argtypes = [wintypes.HKEY, wintypes.LPCWSTR, wintypes.LPDWORD,
+                                  wintypes.LPDWORD, wintypes.LPBYTE, wintypes.LPDWORD]
+    _RegQueryValueExW.restype = wintypes.LONG
+    
+    # 注册表变更通知（事件驱动，代替轮询）
+    _RegNotifyChangeKeyValue = ctypes.WinDLL('advapi32').RegNotifyChangeKeyValue
+    _RegNotifyChangeKeyValue.argtypes = [wintypes.HKEY, wintypes.BOOL, wintypes.DWORD,
+                                         wintypes.HANDLE, wintypes.BOOL]
+    _RegNotifyChangeKeyValue.restype = wintypes.LONG
+    
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _CreateEventW = _kernel32.CreateEventW
+    _CreateEventW.argtypes = [wintypes.LPVOID, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+    _CreateEventW.restype = wintypes.HANDLE
+    _SetEvent = _kernel32.SetEvent
+    _SetEvent.argtypes = [wintypes.HANDLE]
+    _SetEvent.restype = wintypes.BOOL
+    _CloseHandle = _kernel32.CloseHandle
+    _CloseHandle.argtypes = [wintypes.HANDLE]
+    _CloseHandle.restype = wintypes.BOOL
+    _WaitForMultipleObjects = _kernel32.WaitForMultipleObjects
+    _WaitForMultipleObjects.argtypes = [wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE),
+                                        wintypes.BOOL, wintypes.DWORD]
+    _WaitForMultipleObjects.restype = wintypes.DWORD
+else:
+    winreg = None
+
+_ERROR_SUCCESS = 0
+_ERROR_FILE_NOT_FOUND = 2
+_REG_NOTIFY_CHANGE_LAST_SET = 0x00000004
+_INFINITE = 0xFFFFFFFF
+_WAIT_OBJECT_0 = 0
+
+_UNSUPPORTED_RESULT = (False, "仅Windows系统支持此功能")
+
+# 加引号的解释器/可执行文件路径，拼接命令行时直接复用
+_EXE_QUOTED = '"' + sys.executable + '"'
 
 class AutoStartManager:
     """开机自启动管理器（Windows）"""
     
     REG_PATH = r"Software\Microsoft\Windows\CurrentVersion\Run"
-    APP_NAME = "ClassNamePicker"
+    APP_NAME = sys.intern("ClassNamePicker")
+    # 预先编码好的 UTF-16 值名缓冲区，供 ctypes 调用直接传入，免去每次转换
+    _APP_NAME_W = ctypes.create_unicode_buffer(APP_NAME) if _IS_WINDOWS else None
+    
+    # is_enabled() 结果缓存，None 表示尚未查询；enable()/disable() 时失效
+    _enabled_cache = None
+    
+    # 常驻的 Run 键句柄，首次使用时打开，进程退出时关闭
+    _key_handle = None
     
     @staticmethod
     def is_supported():
         """检查当前系统是否支持"""
-        return platform.system() == "Windows"
+        return _IS_WINDOWS
     
     @staticmethod
     def is_enabled():
         """检查是否已设置开机自启动"""
-        if not AutoStartManager.is_supported():
+        if AutoStartManager._enabled_cache is None:
+            AutoStartManager._enabled_cache = AutoStartManager._query_enabled()
+        return AutoStartManager._enabled_cache
+    
+    @staticmethod
+    def invalidate_cache():
+        """清除 is_enabled() 缓存，下次调用时重新读取注册表"""
+        AutoStartManager._enabled_cache = None
+    
+    @staticmethod
+    def _get_key():
+        """获取（必要时打开）缓存的 Run 键句柄"""
+        if AutoStartManager._key_handle is None:
+            # 一次性申请读取+写值权限，避免读写切换时重复打开
+            try:
+                key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, AutoStartManager.REG_PATH, 0,
+                                     winreg.KEY_READ | winreg.KEY_SET_VALUE)
+            except PermissionError:
+                # 无写权限时退回只读，写操作会在调用处报权限不足
+                key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, AutoStartManager.REG_PATH, 0,
+                                     winreg.KEY_READ)
+            AutoStartManager._key_handle = key
+            atexit.register(AutoStartManager._close_key)
+        return AutoStartManager._key_handle
+    
+    @staticmethod
+    def _close_key():
+        """关闭缓存的 Run 键句柄"""
+        if AutoStartManager._key_handle is not None:
+            AutoStartManager._key_handle.Close()
+            AutoStartManager._key_handle = None
+    
+    @staticmethod
+    def _value_exists(key, name):
+        """判断键下是否存在指定值（lpData 传 NULL，不读取值数据）"""
+        rc = _RegQueryValueExW(key.handle, name, None, None, None, None)
+        if rc == _ERROR_SUCCESS:
+            return True
+        if rc == _ERROR_FILE_NOT_FOUND:
             return False
-        
+        raise ctypes.WinError(rc)
+    
+    @staticmethod
+    def _query_enabled():
+        """直接读取注册表判断自启动项是否存在"""
         try:
-            import winreg
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, AutoStartManager.REG_PATH, 0, winreg.KEY_READ) as key:
-                try:
-                    winreg.QueryValueEx(key, AutoStartManager.APP_NAME)
-                    return True
-                except FileNotFoundError:
-                    return False
-        except Exception:
+            return AutoStartManager._value_exists(AutoStartManager._get_key(), AutoStartManager._APP_NAME_W)
+        except OSError:
             return False
         
+    @staticmethod
     def set_enabled(auto_start_config):
-        if auto_start_config == True:
-            AutoStartManager.enable()
-        elif auto_start_config == False:
-            AutoStartManager.disable()
+        """按配置启用或禁用开机自启动"""
+        if auto_start_config:
+            return AutoStartManager.enable()
+        return AutoStartManager.disable()
     
     @staticmethod
     def enable(app_path=None):
         """启用开机自启动"""
-        if not AutoStartManager.is_supported():
-            return False, "仅Windows系统支持此功能"
-        
         if app_path is None:
             app_path = AutoStartManager._get_app_path()
         
         if not app_path:
             return False, "无法获取程序路径"
         
+        AutoStartManager.invalidate_cache()
         try:
-            import winreg
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, AutoStartManager.REG_PATH, 0, winreg.KEY_SET_VALUE) as key:
-                winreg.SetValueEx(key, AutoStartManager.APP_NAME, 0, winreg.REG_SZ, app_path)
+            key = AutoStartManager._get_key()
+            # 已是相同路径时跳过写入，避免无谓地弄脏注册表配置单元
+            try:
+                current_path, _ = winreg.QueryValueEx(key, AutoStartManager.APP_NAME)
+            except FileNotFoundError:
+                current_path = None
+            if current_path == app_path:
+                AutoStartManager._enabled_cache = True
+                return True, "自启动已开启"
+            
+            winreg.SetValueEx(key, AutoStartManager.APP_NAME, 0, winreg.REG_SZ, app_path)
             return True, "设置成功"
         except PermissionError:
             return False, "权限不足，请以管理员身份运行"
-        except Exception as e:
+        except OSError as e:
             return False, f"设置失败: {e}"
     
+    @staticmethod
+    def enable_and_verify(app_path=None):
+        """
+        启用开机自启动，并在同一句柄上读回写入的值
+        返回: (是否成功, 注册表中实际保存的路径 或 错误信息)
+        """
+        success, msg = AutoStartManager.enable(app_path)
+        if not success:
+            return False, msg
+        
+        try:
+            stored_path, _ = winreg.QueryValueEx(AutoStartManager._get_key(), AutoStartManager.APP_NAME)
+        except OSError as e:
+            return False, f"校验失败: {e}"
+        
+        # 已确认写入成功，顺便刷新 is_enabled() 缓存
+        AutoStartManager._enabled_cache = True
+        return True, stored_path
+    
     @staticmethod
     def disable():
         """禁用开机自启动"""
-        if not AutoStartManager.is_supported():
-            return False, "仅Windows系统支持此功能"
-        
+        AutoStartManager.invalidate_cache()
         try:
-            import winreg
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, AutoStartManager.REG_PATH, 0, winreg.KEY_SET_VALUE) as key:
-                winreg.DeleteValue(key, AutoStartManager.APP_NAME)
+            winreg.DeleteValue(AutoStartManager._get_key(), AutoStartManager.APP_NAME)
             return True, "已禁用开机自启动"
         except FileNotFoundError:
             return True, "自启动已关闭"
-        except Exception as e:
+        except OSError as e:
             return False, f"操作失败: {e}"
     
     @staticmethod
-    def _get_app_path():
-        """获取程序完整路径"""
-        # 如果是打包后的exe
-        if getattr(sys, 'frozen', False):
-            return f'"{sys.executable}"'
+    def apply_many(items):
+        """
+        批量设置多个自启动项，只使用一次 Run 键句柄
+        items: [(值名, 命令行路径), ...]，路径为 None 表示删除该项
+        """
+        AutoStartManager.invalidate_cache()
+        try:
+            key = AutoStartManager._get_key()
+            for name, app_path in items:
+                if app_path is None:
+                    try:
+                        winreg.DeleteValue(key, name)
+                    except FileNotFoundError:
+                        pass
+                else:
+                    winreg.SetValueEx(key, name, 0, winreg.REG_SZ, app_path)
+            return True, "设置成功"
+        except PermissionError:
+            return False, "权限不足，请以管理员身份运行"
+        except OSError as e:
+            return False, f"设置失败: {e}"
+    
+    @staticmethod
+    def watch(callback):
+        """
+        监听 Run 键变化，代替轮询 is_enabled()
+        键值变化时清除缓存，并以最新状态调用 callback(enabled)
+        注意 callback 在后台线程中执行，不可直接操作界面控件（可经排队信号转到界面线程）
+        返回: 停止监听的函数
+        """
+        changed_event = _CreateEventW(None, False, False, None)
+        stop_event = _CreateEventW(None, True, False, None)
+        if not changed_event or not stop_event:
+            for handle in (changed_event, stop_event):
+                if handle:
+                    _CloseHandle(handle)
+            raise ctypes.WinError(ctypes.get_last_error())
+        
+        handles = (wintypes.HANDLE * 2)(changed_event, stop_event)
         
-        # 如果是Python脚本
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        main_script = os.path.join(current_dir, "ClassNamePicker.py")
+        # 句柄关闭与 stop() 的 SetEvent 互斥，避免对已关闭的句柄发信号
+        lock = threading.Lock()
+        closed = False
         
-        if os.path.exists(main_script):
-            return f'"{sys.executable}" "{main_script}"'
+        def _close_handles():
+            nonlocal closed
+            with lock:
+                if not closed:
+                    closed = True
+                    _CloseHandle(changed_event)
+                    _CloseHandle(stop_event)
         
-        return None
\ No newline at end of file
+        def _run():
+            try:
+                with winreg.OpenKey(winreg.HKEY_CURRENT_USER, AutoStartManager.REG_PATH, 0,
+                                    winreg.KEY_NOTIFY) as key:
+                    while True:
+                        # 通知为一次性，每次触发后需重新注册
+                        rc = _RegNotifyChangeKeyValue(key.handle, False, _REG_NOTIFY_CHANGE_LAST_SET,
+                                                      changed_event, True)
+                        if rc != _ERROR_SUCCESS:
+                            break
+                        if _WaitForMultipleObjects(2, handles, False, _INFINITE) != _WAIT_OBJECT_0:
+                            break
+                        AutoStartManager.invalidate_cache()
+                        callback(AutoStartManager.is_enabled())
+            except OSError:
+                pass
+            finally:
+                _close_handles()
+        
+        thread = threading.Thread(target=_run, name="AutoStartWatcher", daemon=True)
+        thread.start()
+        
+        def stop():
+            # 线程结束后句柄已关闭，不可再访问
+            with lock:
+                if not closed:
+                    _SetEvent(stop_event)
+        return stop
+    
+    @staticmethod
+    def _get_app_path():
+        """获取程序完整路径（安装位置不变，结果只计算一次）"""
+        return _compute_app_path(getattr(sys, 'frozen', False))
+
+
+@functools.cache
+def _compute_app_path(frozen):
+    """计算程序完整路径（以是否打包为缓存键）"""
+    # 如果是打包后的exe
+    if frozen:
+        return _EXE_QUOTED
+    
+    # 如果是Python脚本
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    main_script = os.path.join(current_dir, "ClassNamePicker.py")
+    
+    if os.path.exists(main_script):
+        return _EXE_QUOTED + ' "' + main_script + '"'
+    
+    return None
+
+
+# 非Windows系统：导入时直接替换为无操作实现，调用时无需再判断平台
+if not _IS_WINDOWS:
+    AutoStartManager.is_enabled = staticmethod(lambda: False)
+    AutoStartManager.enable = staticmethod(lambda app_path=None: _UNSUPPORTED_RESULT)
+    AutoStartManager.enable_and_verify = staticmethod(lambda app_path=None: _UNSUPPORTED_RESULT)
+    AutoStartManager.disable = staticmethod(lambda: _UNSUPPORTED_RESULT)
+    AutoStartManager.apply_many = staticmethod(lambda items: _UNSUPPORTED_RESULT)
+    AutoStartManager.watch = staticmethod(lambda callback: (lambda: None))
\ No newline at end of file
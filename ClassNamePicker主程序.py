@@ -1,12 +1,15 @@
 # ClassNamePicker 主程序
 import sys
+import codecs
+import logging
+import queue
 import random
 import time
+from base64 import b64decode, b64encode
 from pathlib import Path
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import QPoint, QRect, QThread, QTimer, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QElapsedTimer, QPoint, QThread, QTimer, Qt, pyqtSignal, pyqtSlot
 from PyQt5 import QtCore
-from typing import Generator
 from StudentModels import Student, Gender, StudentPool
 from SingleInstanceManager import SingleInstanceManager
 from FloatingWindowManagerPy import FloatingWindowManager
@@ -15,18 +18,56 @@ from PickerConfigManager import ConfigManager, DataFixDialog
 from AutoStartManager import AutoStartManager
 from version import APP_VERSION, APP_VERSION_TIME, APP_VERSION_INFO
 
+try:
+    import charset_normalizer  # 可选依赖：编码检测
+except ImportError:
+    charset_normalizer = None
+
+logger = logging.getLogger(__name__)
+
 # 常量集中管理
 ANIMATION_FPS = 50  # 帧率50fps
+ANIMATION_POOL_SIZE = 50  # 动画采样池最大容量
 TIMER_INTERVAL = 100  # 计时器间隔(ms)
 CONFIG_SAVE_DELAY = 300  # 配置保存延迟(ms)
+DRAG_THROTTLE_MS = 8  # 拖动事件最小处理间隔(ms)
+GEOMETRY_SAVE_DELAY = 1000  # 窗口几何变化后的保存延迟(ms)
+STATS_UPDATE_DELAY = 30  # 统计信息刷新合并窗口(ms)
+# 缺省值占位（区分“键不存在”与“值为 None”）
+_MISSING = object()
+
+# 状态栏统计文本模板
+STATS_TEXT_TEMPLATE = "总人数: {}  |  已抽取: {}  |  可抽取: {}  |  概率: {}%{}"
+REPEAT_STATS_TEXT_TEMPLATE = "总抽取次数: {}{}"
+APP_TITLE = f"课堂随机点名{APP_VERSION_INFO}- ClassNamePicker - {APP_VERSION}({APP_VERSION_TIME})"
+
+# 保存原因合并表：原因 → (合并桶, 合并到桶中的标记)
+# state 与 floating 都需要收集UI状态，合并为 ui_state；floating 额外标记需同步悬浮窗几何
+SAVE_REASON_BUCKETS = {
+    'geometry': ('geometry', {}),
+    'state': ('ui_state', {}),
+    'floating': ('ui_state', {'floating': True}),
+}
+
+def _resolve_log_level(value) -> int:
+    """配置中的日志级别名转为数值（配置可手动编辑：拼写错误或类型不对时退回 WARNING）"""
+    if isinstance(value, str):
+        # getLevelName 对已知级别名返回数值，未知名称返回 "Level xxx" 字符串
+        level = logging.getLevelName(value.strip().upper())
+        if isinstance(level, int):
+            return level
+    return logging.WARNING
 
 class SaveDebouncer:
-    """智能防抖定时器：批量合并+防刷写保护"""
+    """智能防抖定时器：批量合并+防刷写保护+最长等待保护"""
     
-    def __init__(self, delay: int = 300, min_interval: int = 1000, callback=None):
+    def __init__(self, delay: int = 300, min_interval: int = 1000, max_wait: int = None,
+                 leading: bool = False, callback=None):
         """
         delay: 防抖延迟时间（ms）
         min_interval: 最小写入间隔（ms）
+        max_wait: 最长等待时间（ms），持续请求时到期强制执行；None表示不限制
+        leading: 是否前沿触发（静默期后的第一次请求立即执行）
         callback: 超时后回调函数
         """
         self.timer = QTimer()
@@ -35,15 +76,36 @@ class SaveDebouncer:
         
         self.delay = delay
         self.min_interval = min_interval
+        self.max_wait = max_wait
+        self.leading = leading
         self.callback = callback
         
-        self._last_flush_time = time.time() * 1000  # 毫秒时间戳
+        # 单调时钟，不受系统时间调整影响
+        self._clock = QElapsedTimer()
+        self._clock.start()
+        
+        self._last_flush_time = self._clock.elapsed()  # 毫秒时间戳
+        self._first_arm_time = None  # 本轮第一次请求的时间戳
         self._is_pending = False  # 是否有待执行的保存
     
     def start(self, delay: int = None):
         """启动防抖定时器"""
         if delay is None:
             delay = self.delay
+        now = self._clock.elapsed()
+        
+        # 前沿触发：静默期后的第一次请求立即执行
+        if (self.leading and not self._is_pending
+                and now - self._last_flush_time >= self.min_interval):
+            self._flush(now)
+            return
+        
+        if self._first_arm_time is None:
+            self._first_arm_time = now
+        
+        # 最长等待保护：延迟不超过本轮剩余的等待时间
+        if self.max_wait is not None:
+            delay = min(delay, max(0, int(self._first_arm_time + self.max_wait - now)))
         
         # 如果已有待执行请求，重置定时器
         if self._is_pending:
@@ -56,6 +118,7 @@ class SaveDebouncer:
         """停止定时器"""
         self.timer.stop()
         self._is_pending = False
+        self._first_arm_time = None
     
     def isActive(self) -> bool:
         """检查是否激活"""
@@ -64,56 +127,124 @@ class SaveDebouncer:
     def _on_timeout(self):
         """定时器超时处理：检查最小间隔是否满足"""
         self._is_pending = False
-        now = time.time() * 1000
+        now = self._clock.elapsed()
+        
+        # 超过最长等待时间时，不再受最小间隔限制
+        waited_too_long = (self.max_wait is not None and self._first_arm_time is not None
+                           and now - self._first_arm_time >= self.max_wait)
         
         # 检查距离上次写入是否超过最小间隔
-        if now - self._last_flush_time < self.min_interval:
+        if not waited_too_long and now - self._last_flush_time < self.min_interval:
             # 不满足间隔，延迟到满足条件时再执行
             remaining = self.min_interval - (now - self._last_flush_time)
+            if self.max_wait is not None and self._first_arm_time is not None:
+                remaining = min(remaining, self._first_arm_time + self.max_wait - now)
             self.timer.start(int(remaining))
             self._is_pending = True
-            print(f"[SAVE] 防抖保护：剩余{remaining:.0f}ms后允许写入")
+            logger.debug("[SAVE] 防抖保护：剩余%.0fms后允许写入", remaining)
             return
         
         # 满足条件，执行回调
+        self._flush(now)
+    
+    def _flush(self, now: int):
+        """执行回调并结束本轮防抖"""
+        self._first_arm_time = None
         if self.callback:
             self._last_flush_time = now
             self.callback()
 
 class SpeechThread(QThread):
     """
-    异步语音播报线程（比较垃圾，但是能用）
-    用于在后台线程中调用 pyttsx3 播报姓名，避免阻塞主界面。
-    播报结束后通过 finished 信号通知主线程。
+    常驻语音播报线程
+    pyttsx3 引擎只在本线程内初始化一次，播报请求通过队列送入，
+    避免每次抽取都重新初始化 SAPI5 和创建线程。
+    每条播报结束后通过 speech_finished 信号通知主线程。
     """
-    finished = pyqtSignal()
+    speech_finished = pyqtSignal()
     
-    def __init__(self, text, speak_speed=170):
+    def __init__(self):
         super().__init__()
-        self.text = text
-        self.speak_speed = speak_speed
+        self._queue = queue.Queue()
+        self._engine = None
+        self._speak_speed = None
+
+    def say(self, text, speak_speed=170):
+        """加入一条播报请求"""
+        self._queue.put((text, speak_speed))
+
+    def stop(self):
+        """结束线程（等待当前播报完成）"""
+        self._queue.put(None)
+        self.wait()
 
     def run(self):
-        try:
-            import pyttsx3
-            engine = pyttsx3.init(driverName='sapi5')
-            engine.setProperty('rate', self.speak_speed)
-            engine.say(self.text)
-            engine.runAndWait()
-        except Exception as e:
-            print(f"语音错误: {e}")
-        finally:
-            self.finished.emit()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            
+            text, speak_speed = item
+            try:
+                if self._engine is None:
+                    import pyttsx3
+                    self._engine = pyttsx3.init(driverName='sapi5')
+                # 语速未变时不重复设置
+                if speak_speed != self._speak_speed:
+                    self._engine.setProperty('rate', speak_speed)
+                    self._speak_speed = speak_speed
+                self._engine.say(text)
+                self._engine.runAndWait()
+            except Exception as e:
+                print(f"语音错误: {e}")
+            finally:
+                self.speech_finished.emit()
+
+class _ReciteState:
+    """背书计时状态（每个计时周期高频读取，用 __slots__ 代替字典）"""
+    __slots__ = ('mode', 'target_time', 'start_time', 'elapsed')
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self, target_time: float = 0, start_time: float = 0):
+        """原地重置为倒计时模式"""
+        self.mode = 'countdown'         # 模式：'countdown' 或 'elapsed'
+        self.target_time = target_time  # 倒计时目标秒数
+        self.start_time = start_time    # 开始时间戳
+        self.elapsed = 0                # 已用时间
 
 class PickName(QMainWindow, Ui_MainWindow, QWidget):
+    # 注册表自启动项变化（由监听线程发出，排队到界面线程处理）
+    autoStartChanged = pyqtSignal(bool)
+    # 后台写盘失败（由保存线程发出，排队到界面线程重试），参数为该次提交的变更字段
+    backgroundSaveFailed = pyqtSignal(dict)
+    
     def __init__(self):
         super().__init__()  # 初始化QMainWindow
         self.setupUi(self)  # 使用UI设置界面
         self.original_status_bar = self.statusBar()
+        # 需要批量阻塞信号的控件（setupUi后固定不变）
+        self._ui_signal_widgets = (
+            self.pick_again_checkbox,
+            self.g_names_pick_checkbox,
+            self.b_names_pick_checkbox,
+            self.pick_time_checkbox,
+            self.gender_checkBox,
+        )
+        # 复选框勾选状态缓存：(缓存属性名, 控件)，热路径直接读属性，不再跨 Qt 绑定调用 isChecked()
+        self._checkbox_cache_attrs = (
+            ('_pick_again', self.pick_again_checkbox),
+            ('_g_names_pick', self.g_names_pick_checkbox),
+            ('_b_names_pick', self.b_names_pick_checkbox),
+            ('_pick_time', self.pick_time_checkbox),
+            ('_gender_shown', self.gender_checkBox),
+        )
         # 配置窗口实例
         self.config_window = None
-        # 语音线程实例
+        # 语音线程实例（首次播报时创建，之后常驻复用）
         self.speech_thread = None
+        self._is_speaking = False
 
         # 版本信息
         self.version = APP_VERSION
@@ -124,12 +255,15 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         self.student_pool: StudentPool = None
         self.current_gender = Gender.UNKNOWN
 
-        # 动画相关
+        # 动画相关（单次定时器，由_schedule_frame按需逐帧调度）
         self.animation_timer = QTimer()
-        self.animation_timer.setInterval(1000 // ANIMATION_FPS)
+        self.animation_timer.setSingleShot(True)
         self.animation_timer.timeout.connect(self._update_animation)
         self.animation_start_time = 0
-        self.animation_idx_pool = []
+        self.animation_idx_pool = []  # 动画采样池：直接使用 sample_candidate_indices 的结果
+        # 预先展开的逐帧名字序列，每帧只需按下标取值
+        self._animation_frame_names = []
+        self._animation_frame_idx = 0
 
         # 背书计时器
         self.recite_timer = QTimer()
@@ -138,19 +272,33 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         self.recite_elapsed = 0.0
 
         # 计时状态
-        self._recite_state = {
-            'mode': 'countdown',  # 模式：'countdown' 或 'elapsed'
-            'target_time': 0,     # 倒计时目标秒数
-            'start_time': 0,      # 开始时间戳
-            'elapsed': 0,         # 已用时间
-        }
+        self._recite_state = _ReciteState()
+        self._recite_paused = False  # 窗口隐藏时暂停了背书计时器，重新显示时恢复
 
         self._debounce_timer = SaveDebouncer(
             delay=CONFIG_SAVE_DELAY,  # 300ms
             min_interval=1000,         # 最小1秒写入间隔
+            max_wait=5000,             # 持续请求时最多推迟5秒
             callback=self._flush_all_saves
         )
-        self._save_queue = set()        # 保存原因
+        self._save_queue = {}           # 待保存的合并桶 {桶名: 标记}
+        self._deferred_save_updates = {}  # 已收集、等待合并为一次后台写盘的变更字段
+        self.backgroundSaveFailed.connect(self._on_background_save_failed, Qt.QueuedConnection)
+
+        # 窗口几何保存：移动/缩放事件只重置此定时器，停止变化后才登记一次保存
+        self._geometry_save_timer = QTimer(self)
+        self._geometry_save_timer.setSingleShot(True)
+        self._geometry_save_timer.setInterval(GEOMETRY_SAVE_DELAY)
+        self._geometry_save_timer.timeout.connect(self._flush_geometry_save)
+
+        # 统计信息刷新：短时间内多次请求只重算一次状态栏
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setSingleShot(True)
+        self._stats_timer.setInterval(STATS_UPDATE_DELAY)
+        self._stats_timer.timeout.connect(self._do_update_statistics)
+        # 概率文本只随可抽取人数变化，按人数缓存
+        self._stats_prob_available = None
+        self._stats_prob_text = "0"
 
         # 功能状态变量
         self.pick_balanced = False      # 是否平衡抽取
@@ -170,6 +318,9 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         self.no_duplicate_cache = 0      # 缓存的防重复值（用于切换时恢复）
 
         self._data_issues = {'is_valid': True, 'invalid_female': set()} # 数据问题状态
+        self._available_names_dirty = True  # 可抽取名单自上次保存后是否可能变化
+        self._last_ui_state_hash = None     # 上次成功保存的UI状态哈希
+        self._parse_cache = {}              # 名单解析缓存 {文件路径: ((mtime_ns, 文件大小), 学生列表)}
 
         # 窗口拖动状态跟踪
         self._is_moving = False             # 窗口是否在移动中
@@ -177,11 +328,24 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         self._drag_window_start_pos = None  # 窗口起始位置
         self._last_valid_position = None    # 最后有效位置
         self._is_internal_move = False      # 是否内部调整
+        self._drag_bounds = (0, 0, 0, 0)    # 本次拖动允许的窗口左上角范围 (min_x, max_x, min_y, max_y)
+        self._drag_clock = QElapsedTimer()  # 拖动事件节流计时
+        self._drag_cursor = None  # 拖动期间当前设置的光标形状
+        
+        # 主窗口是否可见（隐藏到托盘/悬浮窗模式时跳过界面刷新）
+        self._is_active_ui = True
+        
+        # 复用的消息框（首次使用时创建，之后只更新文本和按钮）
+        self._msg_box = None
+        self._confirm_dialog = None
+
+        # 最近一次保存的窗口几何（原始字节及其base64编码），未变化时跳过重新编码
+        self._last_geometry_raw = None
+        self._last_geometry_b64 = None
 
         #self.setupUi(self)  # 使用UI设置界面
-        self.setWindowTitle(
-            "课堂随机点名{}- ClassNamePicker - {}({})".format(self.version_info, self.version, self.version_time))
-        self.head_label.setText("课堂随机点名{}- ClassNamePicker - {}({})".format(self.version_info, self.version, self.version_time))
+        self.setWindowTitle(APP_TITLE)
+        self.head_label.setText(APP_TITLE)
         # 禁用最大化按钮
         #self.setWindowFlags(self.windowFlags() & ~Qt.WindowMaximizeButtonHint)
         # 禁用最小化按钮
@@ -191,6 +355,8 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
 
         # 绑定控件信号
+        # 缓存更新必须先于业务槽连接：同一信号按连接顺序调用，业务槽读到的已是新值
+        self._bind_checkbox_cache()
         #self.reset_button.setEnabled(True)
         self.reset_button.clicked.connect(self._reset_with_confirm)                     # 重置按钮
         self.pick_time_checkbox.stateChanged.connect(self.set_recite)                   # 背书模式
@@ -213,27 +379,54 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         # 当前配置窗口引用
         self.config_window = None
 
-        # 尝试初始化配置(防止配置不存在)
-        ConfigManager.initialize()
+        # 配置目录与文件已在程序入口初始化（读取日志级别之前）
+        # 启动期间只读取一次配置，依次传给各初始化步骤
+        config = ConfigManager.load_cached()
         
         # 加载顺序：先数据 → 再配置 → 最后UI
-        self._load_student_data()  # 加载学生名单到StudentPool
-        self._restore_application_config()  # 恢复应用配置
-        self._restore_window_state()  # 恢复窗口状态
+        self._load_student_data(config)  # 加载学生名单到StudentPool
+        self._restore_application_config(config)  # 恢复应用配置
+        self._restore_window_state(config)  # 恢复窗口状态
         self._update_statistics()  # 更新统计信息显示
 
-        # 确保自启动状态同步
-        self._sync_auto_start_state()
+        # 非首屏必需的工作推迟到事件循环首轮执行，主窗口可先显示
+        # 确保自启动状态同步（可能涉及注册表读写）
+        QTimer.singleShot(0, self._sync_auto_start_state)
 
         # 初始化悬浮窗管理器（在加载配置后）
+        QTimer.singleShot(0, self._init_floating_manager)
+
+        # ========= 单实例管理器 ==========
+        self._init_single_instance()
+        
+        # ========= 自启动项变化监听（代替打开配置页时的状态核对） ==========
+        self._stop_auto_start_watch = lambda: None
+        if not getattr(self, '_should_exit', False):
+            self._stop_auto_start_watch = self._watch_auto_start()
+
+    def _init_floating_manager(self):
+        """初始化悬浮窗管理器并连接信号"""
         self.floating_manager = FloatingWindowManager(self)
         self.floating_manager.initialize()
         
         # 连接管理器信号
         self.floating_manager.windowHidden.connect(lambda: self.show())
 
-        # ========= 单实例管理器 ==========
-        self._init_single_instance()
+    def _watch_auto_start(self):
+        """订阅注册表 Run 键变化，返回停止监听的函数"""
+        # 回调在监听线程中执行，只发信号；槽函数经排队连接在界面线程运行
+        self.autoStartChanged.connect(self._on_auto_start_changed, Qt.QueuedConnection)
+        try:
+            return AutoStartManager.watch(self.autoStartChanged.emit)
+        except OSError as e:
+            logger.warning("[AUTOSTART] 无法监听自启动项变化: %s", e)
+            return lambda: None
+
+    @pyqtSlot(bool)
+    def _on_auto_start_changed(self, enabled: bool):
+        """自启动项被修改（包括外部修改）：以注册表为准同步配置"""
+        logger.debug("[AUTOSTART] 自启动项变化: %s", enabled)
+        self._sync_auto_start_state()
 
     # ========== 单实例管理初始化 ==========
     def _init_single_instance(self):
@@ -263,13 +456,11 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         self.show()
         self.raise_()
         
-        # 3. 强制窗口管理器注意（Windows特殊处理）
-        current_flags = self.windowFlags()
-        self.setWindowFlags(current_flags & ~Qt.WindowStaysOnTopHint)
-        self.show()
-        QApplication.processEvents()
-        self.setWindowFlags(current_flags | Qt.WindowStaysOnTopHint)
-        self.show()
+        # 3. 激活窗口（Windows下直接请求前台，无需反复切换窗口标志重建句柄）
+        self.activateWindow()
+        if sys.platform == 'win32':
+            import ctypes
+            ctypes.windll.user32.SetForegroundWindow(int(self.winId()))
         
         # ========== 通过管理器处理悬浮窗 ==========
         
@@ -278,11 +469,9 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
             self.floating_manager.hide_all()
             self.floating_manager.reset_positions()  # 重置吸附状态
         
-        # 5. 更新配置状态并立即保存
-        config = ConfigManager.load_cached()
-        config[ConfigManager.KEY_FLOATING_MODE] = "window"  # 改为窗口模式
+        # 5. 更新配置状态并立即保存（只提交该字段：写盘按序号串行，排队中的旧快照不会覆盖本次写入）
         try:
-            ConfigManager.save_atomic(config)
+            ConfigManager.save_patch({ConfigManager.KEY_FLOATING_MODE: "window"})  # 改为窗口模式
             print("[SINGLE] 悬浮窗状态已同步到配置")
         except RuntimeError as e:
             print(f"[SINGLE] 配置保存失败: {e}")
@@ -291,29 +480,33 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         QApplication.processEvents()
 
     # ========== 阶段1：加载学生数据 ==========
-    def _load_student_data(self) -> None:
+    def _load_student_data(self, config: dict = None) -> None:
         """加载学生数据并构建StudentPool"""
         MAX_RETRIES = 2
         retry_count = 0
+        if config is None:
+            config = ConfigManager.load_cached()
         # 加载防重复设置
-        self.no_duplicate = ConfigManager.load_cached().get(ConfigManager.KEY_NO_DUPLICATE, 0)
+        self.no_duplicate = config.get(ConfigManager.KEY_NO_DUPLICATE, 0)
         
         while retry_count <= MAX_RETRIES:
             try:
                 # 加载数据
-                all_students = list(self._parse_student_file(
+                all_students = self._load_student_file(
                     ConfigManager.NAMES_FILE, 
                     default_gender=Gender.UNKNOWN
-                ))
-                female_students = list(self._parse_student_file(
+                )
+                female_students = self._load_student_file(
                     ConfigManager.G_NAMES_FILE, 
                     default_gender=Gender.FEMALE
-                ))
+                )
                 
-                # 一致性校验
-                all_names = {s.original_name for s in all_students}
-                female_names = {s.original_name for s in female_students}
-                invalid_female = female_names - all_names
+                # 一致性校验（复用学生池的名字索引，无需另建总名单集合）
+                pool = StudentPool(all_students, female_students) if all_students else None
+                if pool is not None:
+                    invalid_female = pool.find_unknown_names(female_students)
+                else:
+                    invalid_female = {s.original_name for s in female_students}
                 
                 if invalid_female:
                     # 数据错误：强制修复，无忽略选项
@@ -325,7 +518,8 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
                 
                 # 数据正常
                 self._data_issues = {'is_valid': True}
-                self.student_pool = StudentPool(all_students, female_students)
+                self.student_pool = pool if pool is not None else StudentPool(all_students, female_students)
+                self._available_names_dirty = True
                 
                 # 防重复设置验证
                 total = len(self.student_pool.get_all_students())
@@ -406,8 +600,10 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         # 执行对应操作
         if clicked == "在总名单中添加":
             success, msg = ConfigManager._quick_fix_name_file('add_to_all')
+            self._parse_cache.pop(ConfigManager.NAMES_FILE, None)
         elif clicked == "从女生名单删除":
             success, msg = ConfigManager._quick_fix_name_file('remove_from_girl')
+            self._parse_cache.pop(ConfigManager.G_NAMES_FILE, None)
         else:  # "退出程序"
             return False
         
@@ -461,14 +657,25 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
                 print(f"[DATA] 备份失败 {file_key}: {e}")
                 continue
             
-            # 读取并转换
+            # 读取并转换（只读一次文件，候选编码在内存中解码）
+            raw = file_path.read_bytes()
+            candidates = encodings_to_try
+            
+            # 有 charset_normalizer 时先检测编码，检测结果优先尝试
+            if charset_normalizer is not None:
+                best = charset_normalizer.from_bytes(raw).best()
+                if best is not None:
+                    detected = codecs.lookup(best.encoding).name
+                    print(f"[DATA] {file_key} 检测到编码: {detected}")
+                    candidates = [detected] + [e for e in encodings_to_try if e != detected]
+            
             converted = False
             last_error = None
-            for encoding in encodings_to_try:
+            for encoding in candidates:
                 try:
                     print(f"[DATA] 尝试用 {encoding} 读取 {file_key}...")
                     # 使用 'strict' 模式确保准确检测
-                    content = file_path.read_text(encoding=encoding, errors='strict')
+                    content = raw.decode(encoding, errors='strict')
                     if encoding == 'utf-8':
                         print(f"[DATA] {file_key} 已是 UTF-8 编码，无需转换")
                         converted = True
@@ -478,9 +685,10 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
                             file_path.unlink()
                             print(f"[DATA] {backup_path} 已成功删除")
                         break
-                    # 移除可能的BOM头
+                    # 移除可能的BOM头，统一换行符（write_text会按系统转换）
                     if content.startswith('\ufeff'):
                         content = content[1:]
+                    content = content.replace('\r\n', '\n')
                     
                     # 保存为UTF-8 with BOM（确保Windows记事本等软件正确识别）
                     file_path.write_text(content, encoding='utf-8-sig')
@@ -508,37 +716,49 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         
         return any_converted
 
-    def _parse_student_file(self, file_path: Path, default_gender: Gender) -> Generator[Student, None, None]:
-        """解析学生文件，生成Student对象"""
+    def _load_student_file(self, file_path: Path, default_gender: Gender) -> list[Student]:
+        """读取名单文件（文件未修改时直接复用上次的解析结果）"""
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
+            self._parse_cache.pop(file_path, None)
+            return []
+        
+        # FAT/exFAT 等文件系统的修改时间精度较粗（可达2秒），同时比较文件大小以减少误命中
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._parse_cache.get(file_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        students = self._parse_student_file(file_path, default_gender)
+        self._parse_cache[file_path] = (stamp, students)
+        return students
+
+    def _parse_student_file(self, file_path: Path, default_gender: Gender) -> list[Student]:
+        """解析学生文件，返回Student对象列表"""
         if not file_path.exists():
-            return  # 生成器直接结束
+            return []
         
-        # 使用'utf-8-sig'自动处理BOM头
-        with file_path.open('r', encoding='utf-8-sig') as f:
-            for line_num, line in enumerate(f, 1):
-                #解包，line_num防止line变为int类型
-                stripped = line.strip()
-                
-                # 跳过空行和注释
-                if not stripped or stripped.startswith('#'):
-                    continue
-                
-                # 创建Student对象（数据模型）
-                yield Student(
-                    original_name=line.rstrip('\n'),  # 保留原始格式
-                    display_name=stripped,           # 去空格用于显示
-                    gender=default_gender
-                )
+        # 使用'utf-8-sig'自动处理BOM头，一次读入后整体切分
+        raw = file_path.read_text(encoding='utf-8-sig')
+        
+        # 每行只strip一次，跳过空行和注释
+        names = [s for s in (line.strip() for line in raw.split('\n')) if s and s[0] != '#']
+        
+        # 名字两侧的空白没有意义，original_name与display_name统一使用去空格后的名字，
+        # 与_quick_fix_name_file的比对口径一致
+        return [Student(original_name=name, display_name=name, gender=default_gender) for name in names]
     
     # ========== 阶段2：恢复应用配置 ==========
     
-    def _restore_application_config(self) -> None:
+    def _restore_application_config(self, config: dict = None) -> None:
         """
         从配置恢复应用状态
         - 抽取次数、性别筛选、语音设置等
         - 不依赖UI控件（在setupUi之前调用）
         """
-        config = ConfigManager.load_cached()
+        if config is None:
+            config = ConfigManager.load_cached()
         
         # 恢复抽取次数
         self.picked_count = config.get(ConfigManager.KEY_PICKED_COUNT, 0)
@@ -552,6 +772,7 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         
         # 恢复多音字替换（缓存到内存，避免每次读取文件）
         self._name_changes_cache = ConfigManager.load_name_changes()
+        self._name_change_map = self._build_name_change_map(self._name_changes_cache)
         
         # 恢复抽取模式
         self.is_saving_results = config.get(ConfigManager.KEY_IS_SAVE, False)
@@ -580,9 +801,11 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
 
         # ========== 自动恢复可抽取名单池和统计信息 ==========
         try:
-            saved_names = set(config.get('saved_available_names', []))
+            # 旧版本保存的名字可能带有名单文件中的首尾空白，现在学生原名已去空格，恢复前统一 strip
+            saved_names = {name.strip() for name in config.get(ConfigManager.KEY_SAVED_AVAILABLE_NAMES, [])}
             if self.is_saving_results and saved_names:
                 self.student_pool.restore_available_names(saved_names)
+                self._available_names_dirty = True
                 print(f"[恢复] 已恢复{len(saved_names)}个可用名字")
             else:
                 print("[恢复] 使用默认全可用状态")
@@ -593,19 +816,19 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
     
     # ========== 窗口几何配置 ==========
 
-    def _restore_window_state(self) -> None:
+    def _restore_window_state(self, config: dict = None) -> None:
         """
         恢复窗口几何和控件状态
         - 必须在setupUi之后调用
         - 控件信号应在此时连接
         """
-        config = ConfigManager.load_cached()
+        if config is None:
+            config = ConfigManager.load_cached()
         
         # 1. 恢复窗口几何（使用Qt原生二进制格式）
         geometry_data = config.get(ConfigManager.KEY_WINDOW_GEOMETRY_QT)
         if geometry_data:
             # 从base64解码并恢复（确保可序列化）
-            from base64 import b64decode
             try:
                 self.restoreGeometry(b64decode(geometry_data))
                 print("[WINDOW] 窗口几何已恢复")
@@ -641,91 +864,96 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         self.is_floating_visible = config.get(ConfigManager.KEY_SHOW_FLOATING, True)
     
     def _block_ui_signals(self, block: bool) -> None:
-        """批量阻塞/恢复控件信号"""
-        widgets = [
-            self.pick_again_checkbox,
-            self.g_names_pick_checkbox,
-            self.b_names_pick_checkbox,
-            self.pick_time_checkbox,
-            self.gender_checkBox,
-            # ... 其他控件
-        ]
-        for widget in widgets:
+        """批量阻塞/恢复控件信号（恢复时重新同步勾选状态缓存）"""
+        for widget in self._ui_signal_widgets:
             widget.blockSignals(block)
+        if not block:
+            self._sync_checkbox_cache()
+    
+    def _bind_checkbox_cache(self) -> None:
+        """初始化勾选状态缓存，并随 stateChanged 更新"""
+        self._sync_checkbox_cache()
+        for attr, checkbox in self._checkbox_cache_attrs:
+            checkbox.stateChanged.connect(lambda state, attr=attr: setattr(self, attr, state != Qt.Unchecked))
+    
+    def _sync_checkbox_cache(self) -> None:
+        """从控件重新读取勾选状态（信号被阻塞期间的修改不会触发缓存更新）"""
+        for attr, checkbox in self._checkbox_cache_attrs:
+            setattr(self, attr, checkbox.isChecked())
     
-    def request_save(self, *reasons: str):
+    def request_save(self, *reasons: str, force: bool = False, background: bool = False):
         """
-        注册保存请求
+        注册保存请求（按合并桶去重）
         
-        1. 'geometry' 类型请求自动覆盖（只保留最后一次）
+        1. 'geometry' 类型请求自动覆盖（写入时读取最新几何）
         2. 'state' 和 'floating' 合并为 'ui_state'
-        3. 超过队列长度限制时触发紧急保存
+        3. force=True 时跳过防抖立即写入；持续请求由防抖器的最长等待保护兜底
+        4. background=True（配合force）时只收集变更，由 _submit_deferred_saves() 合并后一次写盘
         """
-        # 几何状态去重：如果已存在geometry请求，先移除（保留新状态）
-        if 'geometry' in reasons and 'geometry' in self._save_queue:
-            self._save_queue.discard('geometry')  # 移除旧的geometry请求
-            print("[SAVE] 合并重复的geometry请求")
-        
-        # 批量注册新请求
-        new_requests = set(reasons)
-        self._save_queue.update(new_requests)
-        
-        # 如果队列过长（>5个），立即触发保存防止积压
-        if len(self._save_queue) > 5:
-            print(f"[SAVE] 队列积压{len(self._save_queue)}个，触发紧急保存")
+        for reason in reasons:
+            bucket, flags = SAVE_REASON_BUCKETS[reason]
+            self._save_queue.setdefault(bucket, {}).update(flags)
+        
+        if force:
             self._debounce_timer.stop()
-            self._flush_all_saves()
+            self._flush_all_saves(background)
             return
         
-        # 正常防抖流程
-        self._debounce_timer.stop()
+        # 正常防抖流程（start会重置定时器，但保留本轮的最长等待计时）
         self._debounce_timer.start(CONFIG_SAVE_DELAY)
         
-        print(f"[SAVE] 注册保存请求: {list(self._save_queue)} (共{len(self._save_queue)}个待保存)")
+        logger.debug("[SAVE] 注册保存请求: %s (共%d个待保存)", list(self._save_queue), len(self._save_queue))
     
-    def _flush_all_saves(self):
+    def _flush_all_saves(self, background: bool = False):
         """
         执行批量保存
         
         优化策略：
-        1. 将多个reason合并为最小配置更新集合
+        1. 按合并桶逐个处理，每个桶只处理一次
         2. 对比内存中的_config_cache，仅写入变更字段
         3. 对geometry使用Qt原生base64编码（保持原有逻辑）
+        4. background=True 时只把变更并入待提交字段，不立即写盘
         """
         if not hasattr(self, '_save_queue') or not self._save_queue:
             return
         
-        reasons_to_process = self._save_queue.copy()
-        self._save_queue.clear()  # 立即清空，防止重入
+        reasons_to_process = self._save_queue
+        self._save_queue = {}  # 立即替换，防止重入
+        ui_state_flags = reasons_to_process.get('ui_state')
         
-        print(f"[SAVE] 开始批量保存: {list(reasons_to_process)}")
+        logger.debug("[SAVE] 开始批量保存: %s", list(reasons_to_process))
 
         config = ConfigManager.load_cached()  # 从内存缓存读取
+        # 已收集但尚未写盘的字段视为当前值，避免与之比较时漏掉回退的变更
+        config.update(self._deferred_save_updates)
         
         # 将多个reason合并为统一的配置更新字典
         updates = {}
         
         # geometry变更（高频）：单独处理
         if 'geometry' in reasons_to_process:
-            from base64 import b64encode
-            geometry_data = b64encode(self.saveGeometry()).decode('ascii')
+            geometry_raw = bytes(self.saveGeometry())
+            if geometry_raw != self._last_geometry_raw:
+                self._last_geometry_raw = geometry_raw
+                self._last_geometry_b64 = b64encode(geometry_raw).decode('ascii')
+            geometry_data = self._last_geometry_b64
             
             # 对比内存缓存，只有真正变化才写入
             if config.get(ConfigManager.KEY_WINDOW_GEOMETRY_QT) != geometry_data:
                 updates[ConfigManager.KEY_WINDOW_GEOMETRY_QT] = geometry_data
-                print("[SAVE] 窗口几何已变更，准备写入")
+                logger.debug("[SAVE] 窗口几何已变更，准备写入")
             else:
-                print("[SAVE] 窗口几何未变化，跳过写入")
+                logger.debug("[SAVE] 窗口几何未变化，跳过写入")
         
         # UI状态变更：批量合并
-        if {'state', 'floating'}.intersection(reasons_to_process):
+        if ui_state_flags is not None:
             # 批量收集UI状态（避免重复读取控件状态）
             new_ui_state = {
                 ConfigManager.KEY_PICKED_COUNT: self.picked_count,
                 ConfigManager.KEY_NO_DUPLICATE: self.no_duplicate,
                 ConfigManager.KEY_PICK_BALANCED: self.pick_balanced,
                 ConfigManager.KEY_RECITE_MODE: self.is_recite_mode,
-                ConfigManager.KEY_PICK_AGAIN: self.pick_again_checkbox.isChecked(),
+                ConfigManager.KEY_PICK_AGAIN: self._pick_again,
                 ConfigManager.KEY_SPEAK_SPEED: self.speak_speed,
                 ConfigManager.KEY_SHOW_FLOATING: self.is_floating_visible,
                 ConfigManager.KEY_AUTO_START: AutoStartManager.is_enabled(),
@@ -738,21 +966,29 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
                     self.floating_manager.get_window_count() == 2
                 )
             
-            # 增量对比：只添加变更的字段
-            for key, new_value in new_ui_state.items():
-                if config.get(key) != new_value:
-                    updates[key] = new_value
-                    print(f"[SAVE] 状态变更 {key}: {config.get(key)} -> {new_value}")
-        
-        # 可抽取名单池：仅在启用自动保存时写入
-        if hasattr(self, 'student_pool') and self.is_saving_results:
-            saved_names = list(self.student_pool.get_available_names())
-            if set(config.get(ConfigManager.KEY_SAVED_AVAILABLE_NAMES, [])) != set(saved_names):
+            # 整体哈希与上次成功保存时一致则跳过逐项对比（键顺序固定，哈希稳定）
+            ui_state_hash = hash(tuple(new_ui_state.items()))
+            if ui_state_hash != self._last_ui_state_hash:
+                # 增量对比：只添加变更的字段
+                for key, new_value in new_ui_state.items():
+                    if config.get(key) != new_value:
+                        updates[key] = new_value
+                        logger.debug("[SAVE] 状态变更 %s: %s -> %s", key, config.get(key), new_value)
+        else:
+            ui_state_hash = None
+        
+        # 可抽取名单池：仅在启用自动保存且名单可能变化时写入
+        names_were_dirty = self._available_names_dirty
+        if hasattr(self, 'student_pool') and self.is_saving_results and names_were_dirty:
+            self._available_names_dirty = False
+            # 名单按固定顺序输出，直接比较列表即可，无需构建集合
+            saved_names = self.student_pool.get_available_names()
+            if config.get(ConfigManager.KEY_SAVED_AVAILABLE_NAMES, []) != saved_names:
                 updates[ConfigManager.KEY_SAVED_AVAILABLE_NAMES] = saved_names
-                print(f"[SAVE] 可抽取名单已更新，共{len(saved_names)}人")
+                logger.debug("[SAVE] 可抽取名单已更新，共%d人", len(saved_names))
         
         # 悬浮窗几何从管理器获取
-        if 'floating' in reasons_to_process and hasattr(self, 'floating_manager'):
+        if ui_state_flags and ui_state_flags.get('floating') and hasattr(self, 'floating_manager'):
             # 获取悬浮窗状态（但不直接写入，由管理器处理）
             floating_states = self.floating_manager.get_window_states()
             for key, value in floating_states.items():
@@ -760,37 +996,76 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
                     updates[key] = value
         
         if not updates:
-            print("[SAVE] 配置无实际变更，取消写入")
+            logger.debug("[SAVE] 配置无实际变更，取消写入")
+            if ui_state_hash is not None:
+                self._last_ui_state_hash = ui_state_hash
+            return
+        
+        if background:
+            self._deferred_save_updates.update(updates)
+            # 写盘尚未发生：提交后若后台写盘失败，_on_background_save_failed 会作废该哈希并重试
+            if ui_state_hash is not None:
+                self._last_ui_state_hash = ui_state_hash
             return
         
         try:
-            # 只更新变更的字段（而非整个config）
-            config.update(updates)
-            ConfigManager.save_atomic(config)  # 内部有SHA256变更检测
-            print(f"[SAVE] 成功写入{len(updates)}个变更字段")
+            # 只提交变更的字段（而非整个config）
+            ConfigManager.save_patch(updates)  # 内部有BLAKE2b变更检测
+            logger.debug("[SAVE] 成功写入%d个变更字段", len(updates))
+            if ui_state_hash is not None:
+                self._last_ui_state_hash = ui_state_hash
         except RuntimeError as e:
-            print(f"[SAVE] 保存失败: {e}")
-            # 失败时将reasons放回队列，延迟重试
-            self._save_queue.update(reasons_to_process)
+            logger.warning("[SAVE] 保存失败: %s", e)
+            self._available_names_dirty = self._available_names_dirty or names_were_dirty
+            # 失败时将未处理的桶放回队列（不覆盖期间新加入的标记），延迟重试
+            for bucket, flags in reasons_to_process.items():
+                self._save_queue[bucket] = {**flags, **self._save_queue.get(bucket, {})}
             QTimer.singleShot(1000, self._flush_all_saves)  # 1秒后重试
         
+    def _submit_deferred_saves(self):
+        """将已收集的全部变更立即并入配置缓存，合并为一次写盘提交到后台保存线程"""
+        if not self._deferred_save_updates:
+            return None
+        updates = self._deferred_save_updates
+        self._deferred_save_updates = {}
+        future = ConfigManager.save_patch_background(updates)
+        if future is not None:
+            future.add_done_callback(lambda f: self._on_background_save_done(f, updates))
+        return future
+
+    def _on_background_save_done(self, future, updates: dict):
+        """后台保存完成回调（在保存线程中执行：只记录日志，失败时经排队信号交回界面线程处理）"""
+        error = future.exception()
+        if error is not None:
+            logger.warning("[SAVE] 后台保存失败: %s", error)
+            self.backgroundSaveFailed.emit(updates)
+
+    def _on_background_save_failed(self, updates: dict):
+        """
+        后台写盘失败：收集这批变更时已记下的UI状态哈希作废（否则下次保存会因哈希相同而跳过），
+        并把变更放回待提交字段延迟重试（期间新收集的同名字段以新值为准）
+        """
+        self._last_ui_state_hash = None
+        self._deferred_save_updates = {**updates, **self._deferred_save_updates}
+        QTimer.singleShot(1000, self._submit_deferred_saves)  # 1秒后重试
+
     def _save_application_state(self):
         """触发应用状态保存（供外部调用）"""
         self.request_save('state')
     
-    def _sync_auto_start_state(self) -> None:
+    def _sync_auto_start_state(self, config: dict = None) -> None:
         """
         同步自启动状态（以注册表为准）
         - 注册表与配置不一致时，自动修正
         """
-        config = ConfigManager.load_cached()
+        if config is None:
+            config = ConfigManager.load_cached()
         config_state = config.get(ConfigManager.KEY_AUTO_START, False)
         actual_state = AutoStartManager.is_enabled()
         
         if config_state != actual_state:
             print(f"[CONFIG] 自启动状态不一致，修正为: {actual_state}")
-            config[ConfigManager.KEY_AUTO_START] = actual_state
-            ConfigManager.save(config)
+            ConfigManager.save_patch({ConfigManager.KEY_AUTO_START: actual_state})
 
     def _rebuild_student_pool(self):
         """重建学生池以应用新的防重复设置"""
@@ -801,8 +1076,9 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
             self.animation_timer.stop()
             print("[重建] 停止动画定时器")
         
-        if hasattr(self, 'animation_idx_pool'):
-            delattr(self, 'animation_idx_pool')
+        if self.animation_idx_pool:
+            self.animation_idx_pool = []
+            self._animation_frame_names = []
             print("[重建] 清理动画池")
         
         old_pool = self.student_pool
@@ -810,32 +1086,60 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         # 保存当前状态
         current_available = old_pool.get_available_names()
 
-        # 保存防重复位图状态
-        old_recent_bitmap = getattr(old_pool, '_recent_bitmap', None)
+        # 保存防重复状态（最近抽取的索引，旧 → 新）
+        old_recent = old_pool.get_recent_indices()
 
-        if self.pick_again_checkbox.isChecked() and self.no_duplicate == 0:
+        if self._pick_again and self.no_duplicate == 0:
             self.no_duplicate = self.no_duplicate_cache
 
-        # 重建池子
+        # 重建池子（学生列表不变，最近抽取索引可直接移交给新池）
         self.student_pool = StudentPool(
             old_pool.get_all_students(),
             old_pool.get_female_students(),
-            self.no_duplicate
+            self.no_duplicate,
+            recent=old_recent if self.no_duplicate > 0 else None
         )
 
         # 恢复状态
         self.student_pool.restore_available_names(current_available)
-        
-        # 5. 恢复防重复状态
-        if self.no_duplicate > 0 and old_recent_bitmap is not None:
-            # 直接复制位图
-            self.student_pool._recent_bitmap = old_recent_bitmap.copy()
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._is_active_ui = True
+        # 补上隐藏期间跳过的统计刷新
+        if hasattr(self, '_stats_timer'):
+            self._update_statistics()
+        # 恢复隐藏期间暂停的背书计时（计时基于时间戳，立即刷新一次即可显示正确时间）
+        if self._recite_paused:
+            self._recite_paused = False
+            self.recite_timer.start()
+            self._update_recite_timer()
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._is_active_ui = False
+        # 计时标签不可见，隐藏期间停止背书计时器
+        if self.recite_timer.isActive():
+            self.recite_timer.stop()
+            self._recite_paused = True
+    
     def moveEvent(self, event):
         super().moveEvent(event)
         # 仅在非移动状态下保存（避免拖拽时频繁触发）
         if not getattr(self, '_is_moving', False):
-            self.request_save('geometry')
+            self._schedule_geometry_save()
+
+    def _schedule_geometry_save(self):
+        """几何变化后延迟保存（连续变化只保存一次）"""
+        # setupUi期间也可能触发移动/缩放事件，此时定时器尚未创建
+        if hasattr(self, '_geometry_save_timer'):
+            self._geometry_save_timer.start()
+
+    def _flush_geometry_save(self):
+        """几何停止变化后登记保存（最大化时不保存，保留常规几何）"""
+        if self.isMaximized():
+            return
+        self.request_save('geometry')
 
     # 在窗口移动时设置标志
     def mousePressEvent(self, event):
@@ -845,7 +1149,22 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
             self._drag_start_pos = event.globalPos()
             self._drag_window_start_pos = self.pos()
             self._last_valid_position = self.pos()
-            self.setCursor(Qt.OpenHandCursor)  # 拖动时显示抓手光标
+            
+            # 屏幕可用区域（自动排除任务栏）和窗口尺寸在拖动期间不变，按下时一次算好边界：
+            # 窗口最多允许有9/10超出屏幕
+            screen = QApplication.primaryScreen().availableGeometry()
+            width, height = self.width(), self.height()
+            margin_x, margin_y = width * 9 // 10, height * 9 // 10
+            self._drag_bounds = (
+                screen.left() - margin_x,
+                screen.right() + margin_x - width + 1,
+                screen.top() - margin_y,
+                screen.bottom() + margin_y - height + 1,
+            )
+            self._drag_clock.start()
+            
+            self._drag_cursor = None
+            self._set_drag_cursor(Qt.OpenHandCursor)  # 拖动时显示抓手光标
             event.accept()
         else:
             super().mousePressEvent(event)
@@ -853,68 +1172,61 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
     def mouseMoveEvent(self, event):
         """拖动时实时限制移动范围"""
         if event.buttons() == Qt.LeftButton and self._is_moving:
-            # 计算鼠标移动距离
-            delta = event.globalPos() - self._drag_start_pos
-            # 计算新位置（未经边界检查）
-            raw_new_pos = self._drag_window_start_pos + delta
-            
-            # 获取屏幕可用区域（自动排除任务栏）
-            screen = QApplication.primaryScreen().availableGeometry()
-            
-            # 计算窗口在目标位置时的几何矩形
-            window_rect = QRect(raw_new_pos, self.size())
-            
-            # 检测是否将要超出边界
-            exceed_left = window_rect.left() < screen.left() - window_rect.width() * 9 // 10
-            exceed_right = window_rect.right() > screen.right() + window_rect.width() *9 // 10
-            exceed_top = window_rect.top() < screen.top() - window_rect.height() *9 // 10
-            exceed_bottom = window_rect.bottom() > screen.bottom() + window_rect.height() *9 // 10
-            
-            # 如果将要越界，阻止该方向移动
-            if exceed_left or exceed_right or exceed_top or exceed_bottom:
-                # 显示禁止光标，不更新窗口位置
-                self.setCursor(Qt.ForbiddenCursor)
-                return  # 直接返回，不移动窗口
-            
-            # 在允许范围内，正常移动并记录有效位置
-            self.setCursor(Qt.ClosedHandCursor)
-            self._last_valid_position = raw_new_pos
-            self.move(raw_new_pos)
             event.accept()
+            # 节流：距上次处理不足 DRAG_THROTTLE_MS 时跳过（松开鼠标时会补上最终位置）
+            if self._drag_clock.elapsed() < DRAG_THROTTLE_MS:
+                return
+            self._drag_clock.restart()
+            self._drag_to(event.globalPos())
         else:
             super().mouseMoveEvent(event)
     
+    def _drag_to(self, global_pos: QPoint):
+        """按鼠标全局位置移动窗口，超出边界时不移动"""
+        # 计算新位置（未经边界检查）
+        raw_new_pos = self._drag_window_start_pos + (global_pos - self._drag_start_pos)
+        x, y = raw_new_pos.x(), raw_new_pos.y()
+        min_x, max_x, min_y, max_y = self._drag_bounds
+        
+        # 如果将要越界，阻止该方向移动
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            # 显示禁止光标，不更新窗口位置
+            self._set_drag_cursor(Qt.ForbiddenCursor)
+            return
+        
+        # 在允许范围内，正常移动并记录有效位置
+        self._set_drag_cursor(Qt.ClosedHandCursor)
+        self._last_valid_position = raw_new_pos
+        self.move(raw_new_pos)
+    
+    def _set_drag_cursor(self, shape):
+        """拖动期间切换光标（形状未变化时不重复设置）"""
+        if shape != self._drag_cursor:
+            self._drag_cursor = shape
+            self.setCursor(shape)
+    
     def mouseReleaseEvent(self, event):
         """拖动结束，检查是否需要回弹"""
         if event.button() == Qt.LeftButton and self._is_moving:
+            # 补上节流期间可能被跳过的最后一次移动
+            self._drag_to(event.globalPos())
+            
             # 恢复光标
             self.unsetCursor()
+            self._drag_cursor = None
             
-            # 获取屏幕可用区域
+            # 屏幕边缘与窗口尺寸只取一次；越界判定复用按下时算好的边界
             screen = QApplication.primaryScreen().availableGeometry()
+            sx0, sy0, sx1, sy1 = screen.left(), screen.top(), screen.right(), screen.bottom()
+            size = self.size()
+            w, h = size.width(), size.height()
+            min_x, max_x, min_y, max_y = self._drag_bounds
+            lx, ly = self._last_valid_position.x(), self._last_valid_position.y()
             
-            # 计算边界临界点位置
-            window_rect = QRect(self._last_valid_position, self.size())
-            final_x = self._last_valid_position.x()
-            final_y = self._last_valid_position.y()
-            
-            needs_adjust = False
-            
-            # 检查水平边界
-            if window_rect.left() < (screen.left() - window_rect.width() * 9 // 10):
-                final_x = screen.left()
-                needs_adjust = True
-            elif window_rect.right() > (screen.right() + window_rect.width() * 9 // 10):
-                final_x = screen.right() - self.width()
-                needs_adjust = True
-            
-            # 检查垂直边界
-            if window_rect.top() < (screen.top() - window_rect.height() * 9 // 10):
-                final_y = screen.top()
-                needs_adjust = True
-            elif window_rect.bottom() > (screen.bottom() + window_rect.height() * 9 // 10):
-                final_y = screen.bottom() - self.height()
-                needs_adjust = True
+            # 超出允许范围时贴回对应屏幕边缘
+            final_x = sx0 if lx < min_x else (sx1 - w if lx > max_x else lx)
+            final_y = sy0 if ly < min_y else (sy1 - h if ly > max_y else ly)
+            needs_adjust = final_x != lx or final_y != ly
             
             # 如果需要回弹，使用平滑动画(似乎没用)
             if needs_adjust:
@@ -923,7 +1235,7 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
             
             # 重置状态并保存
             self._is_moving = False
-            self.request_save('geometry')  # 保存最终位置
+            self._schedule_geometry_save()  # 保存最终位置
             event.accept()
         else:
             super().mouseReleaseEvent(event)
@@ -951,12 +1263,11 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         # ===== 数据问题拦截 =====
         if not self._data_issues['is_valid'] and is_checked:
             # 如果数据有问题，禁止筛选并提示
-            reply = QMessageBox.warning(
-                self,
+            self._show_message_box(
+                QMessageBox.Warning,
                 "数据配置错误",
                 "名单配置存在错误，无法使用性别筛选功能。\n"
-                "请先在配置中修复名单文件。",
-                QMessageBox.Ok
+                "请先在配置中修复名单文件。"
             )
             # 取消勾选
             sender.setChecked(False)
@@ -964,11 +1275,11 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         
         # 状态检查
         if sender == self.g_names_pick_checkbox and is_checked:
-            if self.b_names_pick_checkbox.isChecked():
+            if self._b_names_pick:
                 self.b_names_pick_checkbox.setChecked(False)
             self.current_gender = Gender.FEMALE
         elif sender == self.b_names_pick_checkbox and is_checked:
-            if self.g_names_pick_checkbox.isChecked():
+            if self._g_names_pick:
                 self.g_names_pick_checkbox.setChecked(False)
             self.current_gender = Gender.MALE
         else:
@@ -976,18 +1287,19 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         
         # 智能重置确认
         if is_checked and self.student_pool.get_stats(self.current_gender)[1] == 0:
-            reply = QMessageBox.question(
-                self, "重置名单", "该性别名单已抽完，是否重置？",
+            reply = self._show_message_box(
+                QMessageBox.Question, "重置名单", "该性别名单已抽完，是否重置？",
                 QMessageBox.Yes | QMessageBox.No
             )
             if reply == QMessageBox.Yes:
                 self.student_pool.reset(self.current_gender)
+                self._available_names_dirty = True
         
         self._update_statistics()
     
     def _on_toggle_repeat(self):
         """切换重复模式时处理防重复逻辑"""
-        is_checked = self.pick_again_checkbox.isChecked()
+        is_checked = self._pick_again
         print(f"[MODE] 切换重复模式: {'启用' if is_checked else '禁用'}")
         self.reset_silently()
         
@@ -1021,14 +1333,16 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         self.reset_button.setEnabled(False)
         
         try:
-            allow_repeat = self.pick_again_checkbox.isChecked()
+            allow_repeat = self._pick_again
             display_name = self.student_pool.pick(self.current_gender, remove=not allow_repeat)
+            if not allow_repeat:
+                self._available_names_dirty = True
         except IndexError as e:
         # ===== 新增：智能错误诊断 =====
             if not self._data_issues['is_valid']:
                 # 数据有问题导致的空池
-                QMessageBox.critical(
-                    self,
+                self._show_message_box(
+                    QMessageBox.Critical,
                     "无法抽取",
                     "由于名单配置错误，无法抽取学生。\n\n"
                     "错误原因：g_names.txt 中存在不在总名单中的名字\n"
@@ -1052,42 +1366,79 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         """显示重置名单提示"""
         self.name_label.setText("请重置")
         self.name_label.setStyleSheet("color: red")
-        QMessageBox.information(self, "提示", "所有名字已抽取完毕，请重置")
+        self._show_message_box(QMessageBox.Information, "提示", "所有名字已抽取完毕，请重置")
         self.reset_button.setEnabled(True)
         self.pick_name_button.setEnabled(False)
 
+    def _show_message_box(self, icon, title: str, text: str, buttons=QMessageBox.Ok) -> int:
+        """用复用的消息框模态显示提示，返回用户点击的按钮"""
+        if self._msg_box is None:
+            self._msg_box = QMessageBox(self)
+        box = self._msg_box
+        box.setIcon(icon)
+        box.setWindowTitle(title)
+        box.setText(text)
+        box.setStandardButtons(buttons)
+        return box.exec_()
+
     def _start_animation(self, final_name: str):
         """修复版动画启动：正确采样多个索引"""
         self.animation_start_time = time.time()
         
-        # 获取候选索引（改为调用新的位图方法）
-        candidate_bitmap = self.student_pool._get_candidate_bitmap(self.current_gender)
-        available_indices = [i for i, bit in enumerate(candidate_bitmap) if bit]
+        # 最多采样 ANIMATION_POOL_SIZE 个候选索引（位图内完成无放回抽样）
+        sampled_indices = self.student_pool.sample_candidate_indices(self.current_gender, ANIMATION_POOL_SIZE)
         
         # 空池保护
-        if not available_indices:
+        if not sampled_indices:
             print("[ANIMATION] 警告：动画池为空，直接显示结果")
             self._display_result(final_name)
             return
         
-        # 最多采样50个
-        max_animation = min(len(available_indices), 50)
-        self.animation_idx_pool = random.sample(available_indices, max_animation)
+        # 采样结果本就是新建的列表，直接作为动画池，无需再复制
+        self.animation_idx_pool = sampled_indices
+        max_animation = len(sampled_indices)
+        
+        # 动画时长与帧率在启动时已确定，一次性生成整段帧序列
+        students = self.student_pool._students
+        frame_count = int(self.animation_time * ANIMATION_FPS) + 2
+        self._animation_frame_names = [students[i].display_name
+                                       for i in random.choices(sampled_indices, k=frame_count)]
+        self._animation_frame_idx = 0
+        
         self.animation_final_name = final_name
-        self.animation_timer.start()
+        self._schedule_frame()
         
         print(f"[ANIMATION] 启动动画，采样池大小: {max_animation}")
 
+    def _schedule_frame(self):
+        """
+        调度下一帧动画（已有待执行帧时不重复调度）
+        - 窗口隐藏或最小化时跳过中间帧，直接在动画结束时刻触发
+        """
+        if self.animation_timer.isActive():
+            return
+        
+        if self.isVisible() and not self.isMinimized():
+            self.animation_timer.start(1000 // ANIMATION_FPS)
+        else:
+            remaining = self.animation_time - (time.time() - self.animation_start_time)
+            self.animation_timer.start(max(0, int(remaining * 1000)))
+
     def _update_animation(self):
         """动画帧更新 - 从名字池随机选择"""
         elapsed = time.time() - self.animation_start_time
         if elapsed < self.animation_time:
-            # 从预采样的id池选择，避免每帧生成
-            random_id = random.choice(self.animation_idx_pool)
-            rdm_name = self.student_pool._students[random_id].display_name
-            self.name_label.setText(rdm_name)
+            # 窗口隐藏时不绘制中间帧，_schedule_frame 会直接等到动画结束
+            if self._is_active_ui:
+                # 按顺序取预生成的帧（定时器漂移导致帧数超出时循环复用）
+                frame_names = self._animation_frame_names
+                rdm_name = frame_names[self._animation_frame_idx % len(frame_names)]
+                self._animation_frame_idx += 1
+                # 名字未变化时不触发重绘
+                if rdm_name != self.name_label.text():
+                    self.name_label.setText(rdm_name)
+            self._schedule_frame()
         else:
-            self.animation_timer.stop()
             self._display_result(self.animation_final_name)
 
     def _display_result(self, display_name: str):
@@ -1102,42 +1453,53 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         
         self.picked_count += 1
         # 如果不允许重复，启用重置按钮
-        if not self.pick_again_checkbox.isChecked():
+        if not self._pick_again:
             self.reset_button.setEnabled(True)
         
         if self.is_recite_mode:
             self._start_recite_timer()
 
-        QTimer.singleShot(50, self._update_statistics)
+        self._update_statistics()
 
     def _speak_name_async(self, text):
 
-        # 如果有语音线程在运行，直接返回，避免并发
-        if self.speech_thread and self.speech_thread.isRunning():
+        # 如果正在播报，直接返回，避免并发
+        if self._is_speaking:
             #print("语音线程正在播报，等待播报结束后再抽取")
             return
 
-        self.speech_thread = SpeechThread(
-            text, 
-            speak_speed=self.speak_speed
-        )
-        self.speech_thread.finished.connect(self._on_speech_finished)
+        if self.speech_thread is None:
+            self.speech_thread = SpeechThread()
+            self.speech_thread.speech_finished.connect(self._on_speech_finished)
+            self.speech_thread.start()
+
+        self._is_speaking = True
         self.pick_name_button.setEnabled(False)  # 语音播报时禁用按钮
-        self.speech_thread.start()
+        self.speech_thread.say(text, speak_speed=self.speak_speed)
 
     def _on_speech_finished(self):
+        self._is_speaking = False
         self.pick_name_button.setEnabled(True)
 
+    @staticmethod
+    def _build_name_change_map(name_changes: dict) -> dict:
+        """将多音字配置展开为 {原名: 替换名}（多条同名时以靠前的为准）"""
+        change_map = {}
+        for c in 'abc':
+            orig = name_changes.get(f'speak_change_{c}1', '')
+            if orig:
+                change_map.setdefault(orig, name_changes.get(f'speak_change_{c}2', ''))
+        return change_map
+
     def _apply_name_changes(self, name: str) -> str:
-        """应用多音字替换（带缓存）"""
-        if not hasattr(self, '_name_changes_cache'):
+        """应用多音字替换（单次字典查找）"""
+        if not hasattr(self, '_name_change_map'):
             self._name_changes_cache = ConfigManager.load_name_changes()
-        # 使用字典查找替代循环
-        for i in range(1, 4):
-            orig = self._name_changes_cache.get(f'speak_change_{chr(96+i)}1', '')
-            if name == orig:
-                self.speak_name = self._name_changes_cache.get(f'speak_change_{chr(96+i)}2', name)
-                return self.speak_name
+            self._name_change_map = self._build_name_change_map(self._name_changes_cache)
+        replacement = self._name_change_map.get(name)
+        if replacement:
+            self.speak_name = replacement
+            return replacement
         return name
 
     def _update_recite_timer(self):
@@ -1147,25 +1509,28 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         - 支持正计时模式（0.0 → 持续增加）
         """
         current_time = time.time()
+        state = self._recite_state
         
         # ========== 倒计时模式 ==========
-        if self._recite_state['mode'] == 'countdown':
-            elapsed = current_time - self._recite_state['start_time']
-            remaining = self._recite_state['target_time'] - elapsed
+        if state.mode == 'countdown':
+            elapsed = current_time - state.start_time
+            remaining = state.target_time - elapsed
             
             if remaining > 0:
                 # 显示剩余时间（红色）
                 self.timer_label.setText(f"{remaining:.1f}s")
                 self.timer_label.setStyleSheet("color: red; font-weight: bold;")
-            else:
-                # 倒计时结束，切换到正计时
-                self._recite_state['mode'] = 'elapsed'
-                self._recite_state['start_time'] = current_time
-                self.timer_label.setStyleSheet("color: black;")
+                return
+            
+            # 倒计时结束，切换到正计时：起点取倒计时结束的时刻（而非本次触发的时刻），
+            # 窗口隐藏期间错过的切换也能得到正确的正计时时长
+            state.mode = 'elapsed'
+            state.start_time += state.target_time
+            self.timer_label.setStyleSheet("color: black;")
         
         # ========== 正计时模式 ==========
-        elif self._recite_state['mode'] == 'elapsed':
-            elapsed = current_time - self._recite_state['start_time']
+        if state.mode == 'elapsed':
+            elapsed = current_time - state.start_time
             self.timer_label.setText(f"{elapsed:.1f}s")
 
     def _start_recite_timer(self, initial_seconds: float = 3.0):
@@ -1173,12 +1538,7 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         启动背书计时器
         """
         # 重置状态
-        self._recite_state = {
-            'mode': 'countdown',
-            'target_time': initial_seconds,
-            'start_time': time.time(),
-            'elapsed': 0,
-        }
+        self._recite_state.reset(initial_seconds, time.time())
         
         # 显示标签
         self.timer_label.show()
@@ -1194,24 +1554,21 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         """
         if self.recite_timer.isActive():
             self.recite_timer.stop()
+        self._recite_paused = False
         
         self.timer_label.hide()
-        self._recite_state = {
-            'mode': 'countdown',
-            'target_time': 0,
-            'start_time': 0,
-            'elapsed': 0,
-        }
+        self._recite_state.reset()
         
         print("[RECITE] 计时器停止")
     
-    def reset(self) -> None:
+    def reset(self, update_stats: bool = True, verbose: bool = True) -> None:
         """
         重置当前性别池到初始状态，并重新加载名单文件
         - 从names.txt和g_names.txt重新读取最新数据
         - 清空已抽取集合
         - 恢复所有学生到可抽取状态
-        - 自动更新统计信息
+        - 自动更新统计信息（update_stats=False 时由调用方随后自行刷新）
+        - verbose=False 时不显示“名单已刷新”提示
         """
         # ========== 新增：重新加载名单文件 ==========
         try:
@@ -1220,15 +1577,17 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
                 self.animation_timer.stop()
             if self.recite_timer.isActive():
                 self.recite_timer.stop()
+            self._recite_paused = False
             
             # 重新加载学生数据（从txt文件）
             self._load_student_data()
             
             # 加载成功后显示提示
-            total_count = len(self.student_pool._students)
-            female_count = len(self.student_pool.get_female_students())
-            self.status_label.setText(f"名单已刷新：共{total_count}人（女生{female_count}人）")
-            print(f"[RESET] 名单已刷新，当前可抽取人数: {total_count}")
+            if verbose:
+                total_count = len(self.student_pool._students)
+                female_count = len(self.student_pool.get_female_students())
+                self.status_label.setText(f"名单已刷新：共{total_count}人（女生{female_count}人）")
+                print(f"[RESET] 名单已刷新，当前可抽取人数: {total_count}")
             
         except Exception as e:
             # 加载失败时不中断重置流程，使用旧数据
@@ -1250,7 +1609,8 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         self.timer_label.setText("0.0s")
         
         # 更新统计信息
-        self._update_statistics()
+        if update_stats:
+            self._update_statistics()
         
         # 保存配置（如果启用自动保存）
         if self.is_saving_results:
@@ -1259,8 +1619,9 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         # 恢复抽取按钮状态
         self.pick_name_button.setEnabled(True)
 
-        _, available, _ = self.student_pool.get_stats()  # 使用get_stats()
-        print(f"[RESET] 重置完成，性别池{self.current_gender}已就绪, 当前可抽取人数: {available}")
+        if __debug__:  # 诊断输出，-O 运行时整体剔除
+            _, available, _ = self.student_pool.get_stats()  # 使用get_stats()
+            print(f"[RESET] 重置完成，性别池{self.current_gender}已就绪, 当前可抽取人数: {available}")
 
     # ========== UI交互封装（分离职责） ==========
     def _reset_with_confirm(self) -> None:
@@ -1269,37 +1630,37 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         - 弹出确认对话框（非阻塞）
         - 用户确认后调用reset()
         """
-        # 创建非阻塞确认框
-        self._confirm_dialog = QMessageBox(self)
-        self._confirm_dialog.setWindowTitle("重置确认")
-        self._confirm_dialog.setText("确定要重置点名名单吗？将清空已抽取记录。")
-        self._confirm_dialog.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
-        self._confirm_dialog.setDefaultButton(QMessageBox.No)
+        # 非阻塞确认框只创建一次，之后直接复用
+        if self._confirm_dialog is None:
+            self._confirm_dialog = QMessageBox(self)
+            self._confirm_dialog.setWindowTitle("重置确认")
+            self._confirm_dialog.setText("确定要重置点名名单吗？将清空已抽取记录。")
+            self._confirm_dialog.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+            # 关键：连接finished信号而非exec_()阻塞
+            self._confirm_dialog.finished.connect(self._on_reset_dialog_finished)
+        elif self._confirm_dialog.isVisible():
+            return
         
-        # 关键：连接finished信号而非exec_()阻塞
-        self._confirm_dialog.finished.connect(self._on_reset_dialog_finished)
+        self._confirm_dialog.setDefaultButton(QMessageBox.No)
         self._confirm_dialog.open()
     
     def _on_reset_dialog_finished(self, result: int) -> None:
         """确认框关闭后的回调"""
         if result == QMessageBox.Yes:
-            self.reset()  # 调用核心重置函数
-            self.status_label.setText("已重置名单")  # 临时提示
+            self.reset(update_stats=False, verbose=False)  # 调用核心重置函数（提示随即覆盖，无需刷新统计）
+            self._show_status_message("已重置名单")  # 临时提示
         else:
             print("[RESET] 用户取消重置")
-        
-        # 清理对话框对象
-        self._confirm_dialog.deleteLater()
-        self._confirm_dialog = None
 
     # ========== 静默重置（无UI，供程序内部调用） ==========
     def reset_silently(self) -> None:
         """
         静默重置
         - 不弹窗,不提示
+        - 调用方（切换重复模式、应用配置）随后会自行刷新状态栏
         """
         print("[RESET] 静默重置触发")
-        self.reset()  # 复用核心逻辑
+        self.reset(update_stats=False, verbose=False)  # 复用核心逻辑
     
     # ========== 快捷重置（双击状态栏等） ==========???
     '''def reset_quick(self) -> None:
@@ -1311,69 +1672,85 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
             self._reset_with_confirm()  # 正常确认'''
 
     def _update_statistics(self):
-        """更新状态栏统计信息"""
+        """请求刷新状态栏统计信息（合并短时间内的多次请求）"""
+        self._stats_timer.start()
+
+    def _show_status_message(self, text: str):
+        """显示临时提示，并取消尚未执行的统计刷新以免提示被立即覆盖"""
+        self._stats_timer.stop()
+        self.status_label.setText(text)
+
+    def _do_update_statistics(self):
+        """更新状态栏统计信息（窗口隐藏时跳过，重新显示时补刷）"""
+        if not self._is_active_ui:
+            return
         total, available, picked= self.student_pool.get_stats(self.current_gender)
         
         repeat_info = ""
-        if self.pick_again_checkbox.isChecked() and self.no_duplicate > 0:
+        if self._pick_again and self.no_duplicate > 0:
             #recent_count = len(self.student_pool._recent_pick_ids)
             repeat_info = f" | 防重复: {self.no_duplicate}"#{recent_count}/{self.no_duplicate}"
         
-        if not self.pick_again_checkbox.isChecked():
-            probability = f"{(1 / available * 100):.2f}" if available > 0 else "0"
-            stats_text = (
-                f"总人数: {total}  |  "
-                f"已抽取: {picked}  |  "
-                f"可抽取: {available}  |  "
-                f"概率: {probability}%{repeat_info}"
-            )
+        if not self._pick_again:
+            if available != self._stats_prob_available:
+                self._stats_prob_available = available
+                self._stats_prob_text = f"{(1 / available * 100):.2f}" if available > 0 else "0"
+            stats_text = STATS_TEXT_TEMPLATE.format(total, picked, available, self._stats_prob_text, repeat_info)
         else:
-            stats_text = f"总抽取次数: {self.picked_count}{repeat_info}"
+            stats_text = REPEAT_STATS_TEXT_TEMPLATE.format(self.picked_count, repeat_info)
         
-        self.status_label.setText(stats_text)
+        # 文本未变化时跳过 setText，避免无谓的布局与重绘
+        # （与标签当前文本比较，临时提示覆盖后仍能正确恢复统计信息）
+        if stats_text != self.status_label.text():
+            self.status_label.setText(stats_text)
         
     def set_gender_ui_widget_visible(self):
-        self.gender_ui_widget.setVisible(self.gender_checkBox.isChecked())
+        self.gender_ui_widget.setVisible(self._gender_shown)
         self.g_names_pick_checkbox.setChecked(False)
         self.b_names_pick_checkbox.setChecked(False)
         self.pick_name_button.setChecked(False)
 
     def closeEvent(self, event: QtCore.QEvent) -> None:
         self._stop_recite_timer() # 停止背书计时器
-        # 立即停止防抖定时器并强制刷新
+        # 停止保存定时器，挂起的保存（含尚未到期的几何保存）立即收集，写盘交给后台线程
+        if self._geometry_save_timer.isActive():
+            self._geometry_save_timer.stop()
+            self._flush_geometry_save()
         self._debounce_timer.stop()
         if self._save_queue:
-            self._flush_all_saves()  # 强制完成挂起的保存
+            self._flush_all_saves(background=True)
         self.animation_timer.stop()
         
         # 捕获当前所有状态（包括UI控件实时值）
-        self._capture_final_state()
+        final_state = self._capture_final_state()
+        show_floating = final_state[ConfigManager.KEY_SHOW_FLOATING]
+        if show_floating:
+            # 如果是悬浮窗模式，确保配置正确
+            final_state[ConfigManager.KEY_FLOATING_MODE] = "floating"
+        self._deferred_save_updates.update(final_state)
         
         # 根据模式执行退出
-        if hasattr(self, 'speech_thread') and self.speech_thread and self.speech_thread.isRunning():
-            self.speech_thread.quit()
-            self.speech_thread.wait()
-        
-        config = ConfigManager.load_cached()
-        if config.get(ConfigManager.KEY_SHOW_FLOATING, True):
-            # 如果是悬浮窗模式，确保配置正确
-            config[ConfigManager.KEY_FLOATING_MODE] = "floating"
-            ConfigManager.save_atomic(config)
+        if show_floating:
+            # 提交前先取快照并合并全部待保存字段，供悬浮窗同步（不依赖后台写盘的进度）
+            config = ConfigManager.load_cached()
+            config.update(self._deferred_save_updates)
+            # 挂起的保存与最终状态合并为一次后台写盘，不阻塞切换托盘
+            self._submit_deferred_saves()
             
             # 显示悬浮窗（管理器会自动同步）
-            self.trayify_and_show_fw()
+            self.trayify_and_show_fw(config)
             event.ignore()
         else:
+            # 最终状态随退出时的保存一并写盘
             self._perform_full_exit()
             event.accept()
 
-    def _capture_final_state(self):
-        """捕获最终状态"""
+    def _capture_final_state(self) -> dict:
+        """捕获最终状态，返回待保存的字段（由调用方提交保存）"""
         # 从UI控件直接读取状态
-        config = ConfigManager.load_cached()
-        config.update({
-            ConfigManager.KEY_PICK_AGAIN: self.pick_again_checkbox.isChecked(),
-            ConfigManager.KEY_RECITE_MODE: self.pick_time_checkbox.isChecked(),
+        return {
+            ConfigManager.KEY_PICK_AGAIN: self._pick_again,
+            ConfigManager.KEY_RECITE_MODE: self._pick_time,
             ConfigManager.KEY_GENDER_FILTER: self.current_gender.value,
             ConfigManager.KEY_IS_SAVE: hasattr(self, 'is_saving_results') and self.is_saving_results,
             ConfigManager.KEY_PICK_BALANCED: hasattr(self, 'pick_balanced') and self.pick_balanced,
@@ -1381,35 +1758,36 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
             # 悬浮窗状态必须从管理器获取（最准确）
             ConfigManager.KEY_SHOW_FLOATING: self.is_floating_visible,  #len(self.floating_manager._windows) > 0,
             ConfigManager.KEY_DOUBLE_FLOATING_WINDOW: self.floating_manager.get_window_count() == 2,
-        })
-        
-        # 立即保存
-        ConfigManager.save_atomic(config)
+        }
 
     def _perform_full_exit(self) -> None:
         """释放所有资源并终止应用"""
+        # 保存配置：本次退出收集到的全部变更只写盘一次，并在后台与下面的资源清理并行
+        self.no_duplicate = self.no_duplicate_cache
+        self.floating_manager.flush_pending_save()
+        self.request_save('geometry', 'state', 'floating', force=True, background=True)
+        self._submit_deferred_saves()
+        
         # ========== 清理单实例服务器 ==========
         self.single_instance_manager.cleanup()
         
-        # 保存配置
-        self.no_duplicate = self.no_duplicate_cache
-
-        self.request_save('geometry', 'state', 'floating')
-        self._flush_all_saves()  # 立即执行，不等待防抖
-        try:
-            # 立即保存关键配置
-            config = ConfigManager.load_cached()
-            # ... 更新配置 ...
-            ConfigManager.save_atomic(config)
-            print("[CLOSE] 配置已立即保存")
-        except Exception as e:
-            print(f"[CLOSE] 保存失败: {e}")
+        # 停止自启动项监听线程
+        self._stop_auto_start_watch()
+        
+        # 结束常驻语音线程
+        if self.speech_thread is not None:
+            self.speech_thread.stop()
+            self.speech_thread = None
+        
+        # 等待后台保存全部完成后再退出
+        ConfigManager.shutdown_background_saves()
+        print("[CLOSE] 配置已保存")
         
         # 退出事件循环
         QApplication.quit()
         
-    def trayify_and_show_fw(self):
-        """最小化到托盘并显示悬浮窗：完全委托给管理器"""
+    def trayify_and_show_fw(self, config=None):
+        """最小化到托盘并显示悬浮窗：完全委托给管理器（config 为空时读取缓存）"""
         parent_geometry = self.geometry()
         # 隐藏主窗口
         self.hide()
@@ -1423,7 +1801,7 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         # ========== 通过管理器同步配置并显示 ==========
         
         # 1. 从当前配置同步悬浮窗状态（自动处理重建/更新）
-        config = ConfigManager.load_cached()
+        config = config or ConfigManager.load_cached()
         self.floating_manager._sync_configuration(config)
         
         # 2. 显示所有悬浮窗（管理器会自动处理位置）
@@ -1434,7 +1812,7 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
     def resizeEvent(self, event):
         """重写窗口大小变化事件处理"""
         super().resizeEvent(event)
-        self.request_save('geometry')
+        self._schedule_geometry_save()
         # print(f"窗口尺寸已改变 → 宽度: {current_width}px, 高度: {current_height}px")
 
     def open_config_page(self):
@@ -1452,15 +1830,23 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
     def _on_config_applied(self, new_config: dict):
         """配置应用后的快速路径（无需重新加载文件）"""
         print("[CONFIG] 收到配置应用信号，立即同步")
+        
+        # 与当前实际生效的状态对比（而非上次应用的配置），配置页之外的修改也会被新配置纠正，
+        # 只处理真正不一致的部分
+        synced = self.floating_manager.get_synced_config()
+        floating_changed = any(new_config.get(k, _MISSING) != v for k, v in synced.items())
 
-        self.close_button.setVisible(new_config.get(ConfigManager.KEY_SHOW_FLOATING, True))
+        show_floating = new_config.get(ConfigManager.KEY_SHOW_FLOATING, True)
+        if show_floating != self.is_floating_visible:
+            self.is_floating_visible = show_floating
+            self.close_button.setVisible(show_floating)
         
         # 应用防重复设置（带验证）
         old_no_dup = self.no_duplicate
         self.no_duplicate = new_config.get(ConfigManager.KEY_NO_DUPLICATE, 0)
         if old_no_dup != self.no_duplicate:
             self._rebuild_student_pool()
-            self.status_label.setText(f"防重复次数已更新: {self.no_duplicate}")
+            self._show_status_message(f"防重复次数已更新: {self.no_duplicate}")
 
         # 应用语速和音量
         self.speak_speed = new_config.get(ConfigManager.KEY_SPEAK_SPEED, 170)
@@ -1468,23 +1854,35 @@ class PickName(QMainWindow, Ui_MainWindow, QWidget):
         # 应用动画时长
         self.animation_time = new_config.get(ConfigManager.KEY_ANIMATION_TIME, 0.8)
         
-        # 悬浮窗强制同步（携带配置，避免二次加载）
-        self.floating_manager._sync_configuration(new_config, force_create=True)
+        # 多音字配置已由配置页写入，重建替换表
+        self._name_changes_cache = ConfigManager.load_name_changes()
+        self._name_change_map = self._build_name_change_map(self._name_changes_cache)
+        
+        # 悬浮窗相关配置变化时才强制同步（携带配置，避免二次加载）
+        if floating_changed:
+            self.floating_manager._sync_configuration(new_config, force_create=True)
         
         # 静默重置名单
         if ConfigManager.open_text:
             ConfigManager.open_text = False
             self.reset_silently()
         
-        # 保存所有状态（几何、状态、悬浮窗）
-        self.request_save('geometry', 'state', 'floating')
-        self._flush_all_saves()  # 立即执行，不等待防抖
+        # 保存状态（主窗口几何不受配置页影响；悬浮窗未变化时不必收集其几何）
+        reasons = ('state', 'floating') if floating_changed else ('state',)
+        self.request_save(*reasons, force=True)  # 立即执行，不等待防抖
         
-        self.status_label.setText("配置已更新")
+        self._show_status_message("配置已更新")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     
+    # 初始化配置(防止配置不存在)；日志级别由配置决定（默认只输出警告及以上，调试时可改为 DEBUG）
+    ConfigManager.initialize()
+    logging.basicConfig(
+        level=_resolve_log_level(ConfigManager.load_cached().get(ConfigManager.KEY_LOG_LEVEL)),
+        format='%(message)s'
+    )
+    
     # 创建主窗口
     window = PickName()
     
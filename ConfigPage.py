@@ -1,5 +1,6 @@
 # ConfigPage.py
 import os
+import webbrowser
 from PyQt5 import QtWidgets, QtGui, QtCore
 from config_ui import Ui_ConfigMainWindow
 from PickerConfigManager import ConfigManager, DataFixDialog
@@ -9,18 +10,41 @@ class ConfigWindow(QtWidgets.QMainWindow, Ui_ConfigMainWindow):
     closed = QtCore.pyqtSignal(bool)
     # 信号：配置已应用
     config_applied = QtCore.pyqtSignal(dict)
+    
+    # 多音字输入框控件名及对应的配置键（形状固定，类加载时生成一次）
+    _POLY_KEYS = tuple(f'{c}{i}' for c in 'abc' for i in (1, 2))
+    _POLY_NAME_CHANGE_KEYS = tuple(f'speak_change_{k}' for k in _POLY_KEYS)
 
     def __init__(self):
         super().__init__()
         self.setupUi(self)
         self.setWindowTitle('配置面板')
         
+        # 单次界面操作内复用的配置快照（写入后清空）
+        self._config_cache = None
+        
+        # 多音字输入框：(配置键, 控件)，只构建一次
+        self._polyphonic_fields = tuple(
+            zip(self._POLY_NAME_CHANGE_KEYS, (getattr(self, k) for k in self._POLY_KEYS))
+        )
+        
+        # 数值输入框：(控件, 转换类型, 配置键)；文本变化时解析一次，保存时直接取结果
+        self._numeric_fields = (
+            (self.ani_time_edit, float, ConfigManager.KEY_ANIMATION_TIME),
+            (self.floatsize_x_edit, int, ConfigManager.KEY_FLOATING_X_SIZE),
+            (self.floatsize_y_edit, int, ConfigManager.KEY_FLOATING_Y_SIZE),
+            (self.speed_edit, int, ConfigManager.KEY_SPEAK_SPEED),
+            (self.no_duplicate_edit, int, ConfigManager.KEY_NO_DUPLICATE),
+        )
+        self._parsed = {}
+        
         # 窗口标志
         flags = self.windowFlags()
         self.setWindowFlags(flags & ~QtCore.Qt.WindowMaximizeButtonHint & 
                            ~QtCore.Qt.WindowMinimizeButtonHint | QtCore.Qt.WindowStaysOnTopHint)
         
         # 初始化
+        self._bind_numeric_fields()
         self.load_and_init_ui()
         self._connect_signals()
         self._setup_validators()
@@ -31,7 +55,7 @@ class ConfigWindow(QtWidgets.QMainWindow, Ui_ConfigMainWindow):
     
     def load_and_init_ui(self):
         """合并 load_config 和 init_ui（精简：一次完成）"""
-        config = ConfigManager.load_cached()
+        config = self._get_config(refresh=True)
         name_changes = ConfigManager.load_name_changes()
         
         # 设置控件值
@@ -55,12 +79,13 @@ class ConfigWindow(QtWidgets.QMainWindow, Ui_ConfigMainWindow):
         no_dup = min(config.get(ConfigManager.KEY_NO_DUPLICATE, 0), max(total - 1, 0))
         self.no_duplicate_edit.setText(str(no_dup))
         
+        # 文本与原值相同时 setText 不会发出 textChanged，这里显式解析一遍，不依赖信号
+        for edit, conv, key in self._numeric_fields:
+            self._on_numeric_text_changed(key, conv, edit.text())
+        
         # 多音字
-        for i, c in enumerate('abc'):
-            field1 = getattr(self, f'{c}1')
-            field2 = getattr(self, f'{c}2')
-            field1.setText(name_changes.get(f'speak_change_{c}1', ''))
-            field2.setText(name_changes.get(f'speak_change_{c}2', ''))
+        for key, field in self._polyphonic_fields:
+            field.setText(name_changes.get(key, ''))
         
         # 自启动状态同步
         actual_state = AutoStartManager.is_enabled()
@@ -75,9 +100,16 @@ class ConfigWindow(QtWidgets.QMainWindow, Ui_ConfigMainWindow):
             self, "状态同步",
             f"自启动状态不一致，已自动修正为：{'启用' if actual else '禁用'}"
         )
-        config = ConfigManager.load_cached()
+        config = self._get_config()
         config[ConfigManager.KEY_AUTO_START] = actual
         ConfigManager.save_atomic(config)
+        self._config_cache = None
+    
+    def _get_config(self, refresh=False):
+        """获取配置快照（同一次操作内复用；refresh=True 时重新读取）"""
+        if refresh or self._config_cache is None:
+            self._config_cache = ConfigManager.load_cached()
+        return self._config_cache
     
     def _connect_signals(self):
         """批量连接信号"""
@@ -88,6 +120,19 @@ class ConfigWindow(QtWidgets.QMainWindow, Ui_ConfigMainWindow):
         self.update_button.clicked.connect(self.github_menu)
         self.image_button.clicked.connect(self.select_image)
     
+    def _bind_numeric_fields(self):
+        """数值输入框文本变化时解析并缓存到 _parsed"""
+        for edit, conv, key in self._numeric_fields:
+            edit.textChanged.connect(
+                lambda text, conv=conv, key=key: self._on_numeric_text_changed(key, conv, text))
+    
+    def _on_numeric_text_changed(self, key, conv, text):
+        """解析数值输入；无法解析的中间状态（如空文本）从缓存中移除"""
+        try:
+            self._parsed[key] = conv(text)
+        except ValueError:
+            self._parsed.pop(key, None)
+    
     def _setup_validators(self):
         """设置验证器"""
         total_names = ConfigManager.get_name_count()
@@ -99,14 +144,19 @@ class ConfigWindow(QtWidgets.QMainWindow, Ui_ConfigMainWindow):
         self.no_duplicate_edit.setValidator(QtGui.QIntValidator(0, max_no_duplicate))
         
         # 多音字验证
-        for c in 'abc':
-            for i in (1, 2):
-                field = getattr(self, f'{c}{i}')
-                field.setMaxLength(15)
+        for _, field in self._polyphonic_fields:
+            field.setMaxLength(15)
     
     def save_config(self):
         """收集数据并保存"""
-        config = ConfigManager.load_cached()
+        invalid = [edit for edit, _, key in self._numeric_fields if key not in self._parsed]
+        if invalid:
+            QtWidgets.QMessageBox.warning(self, "输入无效", "请填写完整的数值设置")
+            invalid[0].setFocus()
+            return
+        
+        # 保存前重新读取，避免覆盖主窗口在此期间写入的配置
+        config = self._get_config(refresh=True)
         
         config.update({
             ConfigManager.KEY_IS_SAVE: self.save_checkbox.isChecked(),
@@ -115,13 +165,9 @@ class ConfigWindow(QtWidgets.QMainWindow, Ui_ConfigMainWindow):
             ConfigManager.KEY_FLOATING_AUTOSTICK: self.f_autostick_checkBox.isChecked(),
             ConfigManager.KEY_ANIMATION: self.animation_checkBox.isChecked(),
             ConfigManager.KEY_DOUBLE_FLOATING_WINDOW: self.double_floating_w_checkbox.isChecked(),
-            ConfigManager.KEY_ANIMATION_TIME: float(self.ani_time_edit.text()),
-            ConfigManager.KEY_FLOATING_X_SIZE: int(self.floatsize_x_edit.text()),
-            ConfigManager.KEY_FLOATING_Y_SIZE: int(self.floatsize_y_edit.text()),
-            ConfigManager.KEY_SPEAK_SPEED: int(self.speed_edit.text()),
-            ConfigManager.KEY_NO_DUPLICATE: int(self.no_duplicate_edit.text()),
             ConfigManager.KEY_FLOATING_IMAGE: self.image_path_edit.text(),
         })
+        config.update(self._parsed)
         
         # 自启动处理
         self._handle_auto_start(config)
@@ -134,6 +180,9 @@ class ConfigWindow(QtWidgets.QMainWindow, Ui_ConfigMainWindow):
         except RuntimeError as e:
             QtWidgets.QMessageBox.critical(self, "错误", f"保存失败: {e}")
             return
+        finally:
+            # 快照已被本次修改，不再复用
+            self._config_cache = None
         
         # 广播新配置
         self.config_applied.emit(config)
@@ -159,59 +208,21 @@ class ConfigWindow(QtWidgets.QMainWindow, Ui_ConfigMainWindow):
     
     def _save_name_changes(self):
         """保存多音字"""
-        changes = {f'{c}{i}': getattr(self, f'{c}{i}').text() 
-                  for c in 'abc' for i in (1, 2)}
+        changes = {key: field.text() for key, field in self._polyphonic_fields}
         ConfigManager.save_name_changes(changes)
 
     def open_file(self, file_type):
-        """打开名单文件前自动检测并修复数据问题"""
-        ConfigManager.initialize()
-        
-        all_names = {line.strip() for line in ConfigManager.NAMES_FILE.read_text(encoding='utf-8').splitlines() 
-                    if line.strip() and not line.startswith('#')}
-        g_names = {line.strip() for line in ConfigManager.G_NAMES_FILE.read_text(encoding='utf-8').splitlines() 
-                if line.strip() and not line.startswith('#')}
-        invalid = g_names - all_names
-        
-        if invalid:
-            dialog = DataFixDialog(self, invalid)
-            dialog.exec()
-            
-            clicked = dialog.clickedButton().text()
-            
-            # 执行修复
-            if clicked == "在总名单中添加":
-                success, msg = ConfigManager._quick_fix_name_file('add_to_all')
-            elif clicked == "从女生名单删除":
-                success, msg = ConfigManager._quick_fix_name_file('remove_from_girl')
-            else:  # "退出程序"
-                return  # 不打开文件
-            
-            if success:
-                QtWidgets.QMessageBox.information(self, "修复完成", msg)
-            else:
-                QtWidgets.QMessageBox.critical(self, "修复失败", msg)
-                return  # 修复失败也不打开文件
-        
-        # 修复成功后打开文件
-        file_path = ConfigManager.G_NAMES_FILE if file_type == 'girls' else ConfigManager.NAMES_FILE
-        try:
-            os.startfile(str(file_path))
-            ConfigManager.open_text = True
-            QtCore.QTimer.singleShot(2000, self._update_no_duplicate_validator)
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, '打开失败', str(e))
-    
-    def open_file(self, file_type):
-        """合并：统一打开文件"""
+        """打开名单文件（打开女生名单前检测并修复数据问题）"""
         ConfigManager.initialize()
         
         if file_type == 'girls':
-            # 快速修复女生名单
-            ConfigManager._quick_fix_name_file('remove_from_girl')
+            # 只在打开女生名单时校验；名单一致（常见情况）时不做任何修复
+            invalid = (ConfigManager._read_name_set(ConfigManager.G_NAMES_FILE)
+                       - ConfigManager._read_name_set(ConfigManager.NAMES_FILE))
+            if invalid and not self._fix_invalid_names(invalid):
+                return  # 用户取消或修复失败，不打开文件
             file_path = ConfigManager.G_NAMES_FILE
         else:
-            ConfigManager._quick_fix_name_file('add_to_all')
             file_path = ConfigManager.NAMES_FILE
         
         try:
@@ -222,6 +233,27 @@ class ConfigWindow(QtWidgets.QMainWindow, Ui_ConfigMainWindow):
         except Exception as e:
             QtWidgets.QMessageBox.warning(self, '打开失败', str(e))
 
+    def _fix_invalid_names(self, invalid):
+        """弹出修复对话框并执行所选修复，返回是否可以继续打开文件"""
+        dialog = DataFixDialog(self, invalid)
+        dialog.exec()
+        
+        clicked = dialog.clickedButton().text()
+        
+        # 执行修复
+        if clicked == "在总名单中添加":
+            success, msg = ConfigManager._quick_fix_name_file('add_to_all')
+        elif clicked == "从女生名单删除":
+            success, msg = ConfigManager._quick_fix_name_file('remove_from_girl')
+        else:  # "退出程序"
+            return False
+        
+        if success:
+            QtWidgets.QMessageBox.information(self, "修复完成", msg)
+        else:
+            QtWidgets.QMessageBox.critical(self, "修复失败", msg)
+        return success
+
     def _update_no_duplicate_validator(self):
         """动态更新防重复验证器的上限"""
         total_names = ConfigManager.get_name_count()
@@ -253,5 +285,4 @@ class ConfigWindow(QtWidgets.QMainWindow, Ui_ConfigMainWindow):
 
     @staticmethod
     def github_menu():
-        import webbrowser
         webbrowser.open("https://github.com/Piclaite/ClassNamePicker-Revamp/releases")
\ No newline at end of file
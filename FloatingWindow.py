@@ -1,20 +1,30 @@
 # FloatingWindow.py
-from PyQt5.QtGui import QFontMetrics, QPainter, QBrush, QColor, QFont, QPixmap
+from PyQt5.QtGui import QFontMetrics, QPainter, QBrush, QColor, QFont, QPixmap, QPixmapCache
 from PyQt5.QtWidgets import QApplication, QWidget
 from PyQt5.QtCore import QTimer, Qt, QPoint, pyqtSignal, QSize, QEvent
-from collections import OrderedDict
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
+# 悬浮窗图片交给 Qt 的全局 QPixmapCache 管理（C++ 侧 LRU），上限 10MB
+QPixmapCache.setCacheLimit(10240)
+
 class FloatingWindow(QWidget):
     """极简悬浮窗，只负责UI和交互"""
     __slots__ = ('_side', '_autostick', '_is_snapped', '_is_dragging', 
                  '_snap_opacity', '_default_opacity', '_snap_distance',
-                 '_parent_geometry_cache', '_image_path', '_pixmap_cache')  # 限制属性
+                 '_parent_geometry_cache', '_image_path', '_image_key', '_pixmap_cache',
+                 '_scaled_pixmap', '_scaled_for_size',
+                 '_last_center', '_last_screen_geom')  # 限制属性
     
     hidden = pyqtSignal()  # 信号：窗口被单击隐藏
 
-    _global_image_cache = OrderedDict()
-    _cache_limit = 2  # 最多缓存2张图片
+    # 父窗口中心移动不超过该距离（曼哈顿距离，像素）时复用上次查到的屏幕区域
+    _SCREEN_CACHE_THRESHOLD = 50
+    
+    # 最佳字号缓存：(文字, 宽, 高) → 字号（所有悬浮窗共享）
+    _font_cache = {}
     
     def __init__(self, size_x, size_y, autostick, parent=None, side=None, image_path=None):
         super().__init__(parent)
@@ -38,10 +48,17 @@ class FloatingWindow(QWidget):
 
         # 缓存父窗口几何（用于父窗口不可见时）
         self._parent_geometry_cache = None
+        
+        # 屏幕查询缓存：上次查询的父窗口中心及其所在屏幕的可用区域
+        self._last_center = None
+        self._last_screen_geom = None
 
-        # 加载自定义图片
+        # 加载自定义图片（缩放结果按目标尺寸缓存，避免每次重绘都平滑缩放）
         self._pixmap = QPixmap()
         self._image_path = None
+        self._image_key = None  # 图片缓存键：路径 + 修改时间
+        self._scaled_pixmap = None
+        self._scaled_for_size = None
         self._load_image(image_path)
         
         # 鼠标追踪
@@ -69,38 +86,33 @@ class FloatingWindow(QWidget):
         self._parent_geometry_cache = geometry
     
     def _load_image(self, image_path):
-        """带LRU淘汰的共享图片缓存"""
-        if not image_path or not os.path.exists(image_path):
+        """加载图片（QPixmapCache 共享缓存，键含修改时间，文件被替换后自动失效）"""
+        try:
+            key = f"{image_path}:{os.path.getmtime(image_path)}" if image_path else None
+        except OSError:
+            key = None  # 文件不存在
+        
+        if key is None:
             self._pixmap = QPixmap()
+            self._image_key = None
+            self._scaled_pixmap = None
             return
         
-        if image_path == self._image_path and self._pixmap is not None:
+        if key == self._image_key:
             return
         
         self._image_path = image_path
+        self._image_key = key
+        self._scaled_pixmap = None  # 图片变化，缩放缓存失效
         
-        # 检查全局缓存
-        if image_path in FloatingWindow._global_image_cache:
-            self._pixmap = FloatingWindow._global_image_cache[image_path]
-            # 移动到最近使用
-            FloatingWindow._global_image_cache.move_to_end(image_path)
-            return
-        
-        # 加载新图片
-        pixmap = QPixmap()
-        if pixmap.load(image_path):
-            # 限制缓存大小
-            if len(FloatingWindow._global_image_cache) >= self._cache_limit:
-                # 淘汰最久未使用的图片
-                oldest_path, _ = FloatingWindow._global_image_cache.popitem(last=False)
-                print(f"[IMAGE] 缓存淘汰: {oldest_path}")
-            
-            # 添加到缓存
-            FloatingWindow._global_image_cache[image_path] = pixmap
-            self._pixmap = pixmap
-            print(f"[IMAGE] 加载并缓存: {image_path} ({pixmap.width()}x{pixmap.height()})")
-        else:
-            self._pixmap = QPixmap()  # 空图片
+        # 检查全局缓存，未命中再解码
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None or pixmap.isNull():
+            pixmap = QPixmap()
+            if pixmap.load(image_path):
+                QPixmapCache.insert(key, pixmap)
+                logger.debug("[IMAGE] 加载并缓存: %s (%dx%d)", image_path, pixmap.width(), pixmap.height())
+        self._pixmap = pixmap
             
     def initialize_position(self):
         """基于主窗口位置初始化到屏幕边缘"""
@@ -108,12 +120,12 @@ class FloatingWindow(QWidget):
         if self.parent() and self.parent().isVisible():
             parent_geo = self.parent().geometry()
             center_x = parent_geo.center().x()
-            screen = QApplication.screenAt(parent_geo.center()).availableGeometry()
+            screen = self._screen_geometry_at(parent_geo.center())
         elif self._parent_geometry_cache:
             # 使用缓存的几何信息
             parent_geo = self._parent_geometry_cache
             center_x = parent_geo.center().x()
-            screen = QApplication.screenAt(parent_geo.center()).availableGeometry()
+            screen = self._screen_geometry_at(parent_geo.center())
         else:
             # fallback: 使用屏幕中心
             screen = QApplication.primaryScreen().availableGeometry()
@@ -137,12 +149,26 @@ class FloatingWindow(QWidget):
         self.move(target_x, target_y)
         self._set_snapped(True)
     
+    def _screen_geometry_at(self, point):
+        """查询点所在屏幕的可用区域（与上次查询点相距很近时直接复用，不再逐屏命中测试）"""
+        if (self._last_screen_geom is not None
+                and (point - self._last_center).manhattanLength() < self._SCREEN_CACHE_THRESHOLD):
+            return self._last_screen_geom
+        
+        # 点落在所有屏幕之外时 screenAt 返回 None，退回悬浮窗当前所在屏幕
+        screen = QApplication.screenAt(point) or self.screen()
+        self._last_center = point
+        self._last_screen_geom = screen.availableGeometry()
+        return self._last_screen_geom
+    
     def _set_snapped(self, snapped: bool):
         """内部状态设置"""
         if self._is_snapped != snapped:
             self._is_snapped = snapped
             self.setWindowOpacity(self._snap_opacity if snapped else self._default_opacity)
-            self.update()  # 触发重绘
+            # 只有文字模式的内容随吸附状态变化；图片模式仅透明度改变，无需重绘
+            if self._pixmap.isNull():
+                self.update()
     
     def reset_snapped_state(self):
         """重置吸附状态（主窗口显示时调用）"""
@@ -161,12 +187,16 @@ class FloatingWindow(QWidget):
 
         # 如果图片有效，绘制图片；否则绘制文字
         if not self._pixmap.isNull():
-            # 计算缩放比例，保持宽高比
-            scaled_pixmap = self._pixmap.scaled(
-                self.size() - QSize(20, 20),  # 留边距
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
+            # 计算缩放比例，保持宽高比（仅在目标尺寸变化或图片更换后重新缩放）
+            target = self.size() - QSize(20, 20)  # 留边距
+            if self._scaled_pixmap is None or self._scaled_for_size != target:
+                self._scaled_pixmap = self._pixmap.scaled(
+                    target,
+                    Qt.KeepAspectRatio,
+                    Qt.SmoothTransformation
+                )
+                self._scaled_for_size = target
+            scaled_pixmap = self._scaled_pixmap
             
             # 居中绘制
             x = (self.width() - scaled_pixmap.width()) // 2
@@ -187,18 +217,36 @@ class FloatingWindow(QWidget):
             painter.drawText(self.rect(), Qt.AlignCenter, text)
     
     def _calc_optimal_font_size(self,text: str) -> int:
-        """计算最佳字体大小"""
-        base_size = int(self.height() * 0.4)
-        for size in range(base_size, 8, -1):
-            test_font = QFont("黑体", size, QFont.Bold)
-            metrics = QFontMetrics(test_font)
-            if metrics.boundingRect(self.rect(), Qt.AlignCenter, text).width() <= self.width() * 0.8:
-                return size
-        return 8
+        """计算最佳字体大小（结果按文字和窗口尺寸缓存）"""
+        key = (text, self.width(), self.height())
+        size = FloatingWindow._font_cache.get(key)
+        if size is None:
+            size = FloatingWindow._font_cache[key] = self._fit_font_size(text)
+        return size
+    
+    def _fit_font_size(self, text: str) -> int:
+        """
+        二分查找文字宽度不超过窗口80%的最大字号（9 ~ 高度的40%，都不满足时为8）
+        文字宽度随字号单调递增，二分只需 O(log n) 次字体度量
+        """
+        rect = self.rect()
+        max_width = self.width() * 0.8
+        best = 8
+        lo, hi = 9, int(self.height() * 0.4)
+        while lo <= hi:
+            size = (lo + hi) // 2
+            metrics = QFontMetrics(QFont("黑体", size, QFont.Bold))
+            if metrics.boundingRect(rect, Qt.AlignCenter, text).width() <= max_width:
+                best = size
+                lo = size + 1
+            else:
+                hi = size - 1
+        return best
     
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self._snap_distance = int(self.width() * 0.4)
+        self._scaled_pixmap = None  # 尺寸变化，缩放缓存失效
         
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -263,23 +311,23 @@ class FloatingWindow(QWidget):
             # 用户主动隐藏，允许执行
             self._user_hidden = False  # 重置标志
             super().hideEvent(event)
-            print(f"[FLOAT] 用户主动隐藏窗口")
+            logger.debug("[FLOAT] 用户主动隐藏窗口")
         else:
             #系统强制隐藏（如"显示桌面"），阻止并自动恢复
             event.ignore()
-            print(f"[FLOAT] 阻止系统强制隐藏，准备恢复...")
+            logger.debug("[FLOAT] 阻止系统强制隐藏，准备恢复...")
             QTimer.singleShot(50, self._force_show)  # 延迟50ms后强制显示
 
     def _force_show(self):
         """强制将窗口置顶显示"""
         if self.parent() and self.parent().isVisible():
-            print("[FLOAT] 父程序可见，不恢复悬浮窗")
+            logger.debug("[FLOAT] 父程序可见，不恢复悬浮窗")
             return
         
         self.show()
         self.raise_()
         self.activateWindow()
-        print(f"[FLOAT] 窗口已强制恢复显示")
+        logger.debug("[FLOAT] 窗口已强制恢复显示")
 
     def changeEvent(self, event):
         """监听窗口状态变化，防止被最小化"""
@@ -289,7 +337,7 @@ class FloatingWindow(QWidget):
                 self.setWindowState(self.windowState() & ~Qt.WindowMinimized)
                 self.show()
                 self.raise_()
-                print(f"[FLOAT] 阻止最小化并恢复")
+                logger.debug("[FLOAT] 阻止最小化并恢复")
         super().changeEvent(event)
 
     
\ No newline at end of file
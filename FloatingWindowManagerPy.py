@@ -1,11 +1,18 @@
 # FloatingWindowManagerPy.py
+import logging
+
 from PyQt5.QtCore import QObject, QSize, QTimer, pyqtSignal
 from FloatingWindow import FloatingWindow
 from PickerConfigManager import ConfigManager
 
+logger = logging.getLogger(__name__)
+
 class FloatingWindowManager(QObject):
     """悬浮窗生命周期统一管理器"""
     
+    # 运行模式写盘的合并延迟（毫秒）：连续单击隐藏只落盘一次
+    MODE_SAVE_DELAY = 500
+    
     # 信号：悬浮窗被单击隐藏时通知主窗口
     windowHidden = pyqtSignal()
 
@@ -15,6 +22,14 @@ class FloatingWindowManager(QObject):
         self.parent = parent_window
         self._windows = []  # 存储所有悬浮窗实例
         self._config_snapshot = {}  # 配置快照，用于对比变更
+        self._sides_snapshot = ()  # 当前实例的吸附边布局，与 _windows 同步维护
+        
+        # 待写盘的运行模式（None 表示无挂起写入），由单次定时器合并提交
+        self._pending_mode = None
+        self._mode_save_timer = QTimer(self)
+        self._mode_save_timer.setSingleShot(True)
+        self._mode_save_timer.setInterval(self.MODE_SAVE_DELAY)
+        self._mode_save_timer.timeout.connect(self.flush_pending_save)
     
     def initialize(self):
         """初始化：根据当前配置创建悬浮窗"""
@@ -32,7 +47,7 @@ class FloatingWindowManager(QObject):
         if not force_create and current_revision == self._config_revision:
             return  # 配置完全相同，直接跳过
         
-        print(f"[FLOAT] 配置变更检测: 旧版本={self._config_revision}, 新版本={current_revision}")
+        logger.debug("[FLOAT] 配置变更检测: 旧版本=%s, 新版本=%s", self._config_revision, current_revision)
 
         # 更新版本号
         self._config_revision = current_revision
@@ -60,22 +75,19 @@ class FloatingWindowManager(QObject):
     
     def _needs_rebuild(self, cfg: dict) -> bool:
         """判断是否需要重建悬浮窗实例"""
-        rebuild_flags = [
-            len(self._windows) != (2 if cfg['double'] else 1),
-            cfg['double'] and [w.side for w in self._windows] != ["left", "right"],
-            self._config_snapshot.get('image_path') != cfg['image_path']  # 仅图片路径变化重建
-        ]
-        return any(rebuild_flags)
+        # 短路求值：布局不符即可返回，无需再比较图片
+        return (self._sides_snapshot != (("left", "right") if cfg['double'] else (None,))
+                or self._config_snapshot.get('image_path') != cfg['image_path'])  # 仅图片路径变化重建
     
     def _rebuild_windows(self, cfg: dict):
         """重建所有悬浮窗实例"""
-        print(f"[FLOAT] 重建悬浮窗: 双窗={cfg['double']}, 吸附={cfg['autostick']}")
+        logger.debug("[FLOAT] 重建悬浮窗: 双窗=%s, 吸附=%s", cfg['double'], cfg['autostick'])
         
         # 安全销毁旧实例
         self._destroy_all()
         
         # 批量创建新实例
-        sides = ["left", "right"] if cfg['double'] else [None]
+        sides = ("left", "right") if cfg['double'] else (None,)
         for side in sides:
             window = FloatingWindow(
                 size_x=cfg['size_x'],
@@ -92,10 +104,12 @@ class FloatingWindowManager(QObject):
             # 延迟初始化位置，确保窗口系统已就绪
             if cfg['autostick']:
                 QTimer.singleShot(50, window.initialize_position)
+        self._sides_snapshot = sides
 
     def _update_windows(self, cfg: dict):
         """仅更新现有实例属性"""
-        print(f"[FLOAT] 更新悬浮窗属性: 尺寸=({cfg['size_x']},{cfg['size_y']}), 吸附={cfg['autostick']}, 图片={cfg['image_path']}")
+        logger.debug("[FLOAT] 更新悬浮窗属性: 尺寸=(%s,%s), 吸附=%s, 图片=%s",
+                     cfg['size_x'], cfg['size_y'], cfg['autostick'], cfg['image_path'])
         for win in self._windows:
             if win.size() != QSize(cfg['size_x'], cfg['size_y']):
                 win.setFixedSize(cfg['size_x'], cfg['size_y'])
@@ -109,22 +123,31 @@ class FloatingWindowManager(QObject):
             win.close()
             win.deleteLater()
         self._windows.clear()
+        self._sides_snapshot = ()
     
     def show_all(self, parent_geometry=None):
         """批量显示所有悬浮窗"""
         if not self._windows:
             return
         
+        # 重新回到悬浮窗模式，尚未落盘的"window"模式已过期，直接丢弃
+        self._mode_save_timer.stop()
+        self._pending_mode = None
+        
+        # 先全部显示再统一恢复绘制：双窗模式下只产生一轮重绘
         for win in self._windows:
+            win.setUpdatesEnabled(False)
             # **传递父窗口几何信息**
             if parent_geometry is not None:
                 win.set_parent_geometry(parent_geometry)
             win.show()
             win.raise_()
+        for win in self._windows:
+            win.setUpdatesEnabled(True)
     
     def hide_all(self):
         """批量隐藏所有悬浮窗"""
-        print('[FLOAT] Hide')
+        logger.debug('[FLOAT] Hide')
         for win in self._windows:
             win._user_hidden = True
             win.hide()
@@ -148,17 +171,25 @@ class FloatingWindowManager(QObject):
         self.hide_all()
         for win in self._windows:
             win._user_hidden = False
-        # 更新配置
-        config = ConfigManager.load_cached()
-        config[ConfigManager.KEY_FLOATING_MODE] = "window"
+        # 更新配置：只记录模式，延迟合并写盘（不在点击回调里同步整份保存）
+        self._pending_mode = "window"
+        self._mode_save_timer.start()
+    
+    def flush_pending_save(self):
+        """立即写入挂起的运行模式（退出前调用，定时器到期时也走这里）"""
+        self._mode_save_timer.stop()
+        if self._pending_mode is None:
+            return
+        mode, self._pending_mode = self._pending_mode, None
         try:
-            ConfigManager.save_atomic(config)
+            ConfigManager.save_patch({ConfigManager.KEY_FLOATING_MODE: mode})
         except RuntimeError as e:
-            print(f"[FLOAT] 配置保存失败: {e}")
+            logger.warning("[FLOAT] 配置保存失败: %s", e)
 
     def force_sync(self):
         """外部调用的强制同步入口"""
-        print("[FLOAT] 收到强制同步指令")
+        logger.debug("[FLOAT] 收到强制同步指令")
+        # 无条件重建：用于恢复修订号未变但实际状态已偏离的窗口（修订号捷径只在 soft_sync 中使用）
         self._config_revision = -1  # 重置版本号，下次同步必定触发
         config = ConfigManager.load_cached()
         self._sync_configuration(config, force_create=True)
@@ -166,17 +197,39 @@ class FloatingWindowManager(QObject):
     def soft_sync(self, config: dict = None):
         """悬浮窗同步（用于高频事件，如窗口移动）"""
         if config is None:
+            # 修订号与已同步的版本一致时，尺寸已由完整同步应用，不必读取配置
+            if ConfigManager.current_revision() == self._config_revision:
+                return
             config = ConfigManager.load_cached()
         
+        if not self._windows:
+            return
+        
         current_cfg = {
-            'show': config.get(ConfigManager.KEY_SHOW_FLOATING, True),
-            'size_x': config.get(ConfigManager.KEY_FLOATING_X_SIZE, 100),
-            'size_y': config.get(ConfigManager.KEY_FLOATING_Y_SIZE, 100),
+            'double': config.get(ConfigManager.KEY_DOUBLE_FLOATING_WINDOW, False),
+            'image_path': config.get(ConfigManager.KEY_FLOATING_IMAGE, None),
         }
+        if self._needs_rebuild(current_cfg):
+            return
         
-        if self._windows and not self._needs_rebuild(current_cfg):
-            for win in self._windows:
-                win.setFixedSize(current_cfg['size_x'], current_cfg['size_y'])
+        # 只对尺寸确实不同的窗口调用 setFixedSize，避免多余的 resize 与重绘
+        target = QSize(config.get(ConfigManager.KEY_FLOATING_X_SIZE, 100),
+                       config.get(ConfigManager.KEY_FLOATING_Y_SIZE, 100))
+        for win in self._windows:
+            if win.size() != target:
+                win.setFixedSize(target)
+
+    def get_synced_config(self) -> dict:
+        """最近一次完整同步实际应用的悬浮窗配置（以配置键表示），供外部与新配置比较"""
+        cfg = self._config_snapshot
+        return {
+            ConfigManager.KEY_SHOW_FLOATING: cfg.get('show'),
+            ConfigManager.KEY_DOUBLE_FLOATING_WINDOW: cfg.get('double'),
+            ConfigManager.KEY_FLOATING_AUTOSTICK: cfg.get('autostick'),
+            ConfigManager.KEY_FLOATING_X_SIZE: cfg.get('size_x'),
+            ConfigManager.KEY_FLOATING_Y_SIZE: cfg.get('size_y'),
+            ConfigManager.KEY_FLOATING_IMAGE: cfg.get('image_path'),
+        }
 
     def get_window_count(self) -> int:
         return len(self._windows)
\ No newline at end of file
@@ -1,15 +1,57 @@
 # PickerConfigManager.py
 import binascii
+from concurrent.futures import ThreadPoolExecutor
 import copy
 import hashlib
 import json
+import logging
 import os
 from pathlib import Path
+import shutil
+import threading
 import time
 
 from PyQt5 import QtWidgets
 import bitarray
 
+try:
+    import orjson  # 可选依赖：更快的 JSON 序列化
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps_config(obj) -> bytes:
+    """序列化配置为 UTF-8 字节（键排序、缩进 2，两种实现输出一致）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, indent=2).encode('utf-8')
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    """
+    原子写文件：写入同目录的临时文件并 fsync 后 os.replace 覆盖
+    临时文件与目标同目录，保证 replace 不会跨设备；写到一半崩溃也不会留下截断的目标文件
+    """
+    data = memoryview(data)
+    tmp_file = path.with_name(path.name + '.tmp')
+    fd = os.open(str(tmp_file), os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(str(tmp_file), str(path))
+
+
+def _loads_config(data: bytes):
+    """从 UTF-8 字节解析配置"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 # 修复名单对话框
 class DataFixDialog(QtWidgets.QMessageBox):
     def __init__(self, parent, invalid_names: set):
@@ -18,7 +60,7 @@ class DataFixDialog(QtWidgets.QMessageBox):
         self.setIcon(QtWidgets.QMessageBox.Critical)
         
         # 构建详细错误信息
-        detail_text = "\n".join(f"{name}" for name in sorted(list(invalid_names)))#[:10]))
+        detail_text = "\n".join(sorted(invalid_names))
         
         self.setText(f"发现 {len(invalid_names)} 个女生名字不在总名单中")
         self.setDetailedText(detail_text)
@@ -31,8 +73,18 @@ class DataFixDialog(QtWidgets.QMessageBox):
 
 class ConfigManager:
     _config_cache = None
-    _last_save_hash = None
+    _last_save_hash = None  # 上次写盘内容（不含修订号）的 BLAKE2b 摘要（bytes）
+    # 配置缓存可能被后台保存线程访问：读写缓存、序列化需持锁；写盘与 fsync 在锁外进行，不阻塞读取
+    _lock = threading.RLock()
+    # 写盘按准备时的序号串行：各线程的写盘互斥，较旧的快照晚到时直接丢弃，磁盘上总是最新内容
+    _write_lock = threading.Lock()
+    _save_seq = 0      # 已准备的写盘序号（持 _lock 递增）
+    _written_seq = 0   # 已落盘的最大序号（持 _write_lock 更新）
+    # 后台保存：单线程按提交顺序写盘
+    _save_executor = None
+    _last_save_future = None
     open_text = False  # 标记：是否打开过文本编辑器
+    _name_count_cache = None  # 总名单人数缓存：((文件修改时间ns, 文件大小), 人数)
 
     CONFIG_DIR = Path(__file__).parent / "PickNameConfig"
     CONFIG_FILE = CONFIG_DIR / "config.json"
@@ -63,6 +115,7 @@ class ConfigManager:
     KEY_FLOATING_MODE = "floating_mode"   # 运行时模式 "window" or "floating"
     KEY_INTERNAL_REVISION = "_revision"  # 内部修订号
     KEY_FLOATING_IMAGE = "floating_image"  # 图片路径
+    KEY_LOG_LEVEL = "log_level"  # 日志级别（DEBUG/INFO/WARNING...）
     
     DEFAULT_CONFIG = {
         KEY_ANIMATION_TIME: 0.8,
@@ -86,6 +139,7 @@ class ConfigManager:
         KEY_SAVED_AVAILABLE_NAMES: [],
         KEY_PICKED_COUNT: 0,
         KEY_GENDER_FILTER: 'unknown',
+        KEY_LOG_LEVEL: 'WARNING',
     }
     
     @classmethod
@@ -97,79 +151,212 @@ class ConfigManager:
         if not cls.CONFIG_FILE.exists():
             cls.save_atomic(cls.DEFAULT_CONFIG)
         
-        # 创建名单文件
+        # 创建名单文件（与其它名单写入一样原子替换，中途崩溃不会留下半截的名单）
         if not cls.NAMES_FILE.exists():
-            cls.NAMES_FILE.write_text("#以井号开头的行不会被读取\n名字1\n名字2\n名字3\n女名1\n女名2\n女名3\n", encoding='utf-8')
+            _atomic_write_bytes(cls.NAMES_FILE, "#以井号开头的行不会被读取\n名字1\n名字2\n名字3\n女名1\n女名2\n女名3\n".encode('utf-8'))
         
         if not cls.G_NAMES_FILE.exists():
-            cls.G_NAMES_FILE.write_text("#以井号开头的行不会被读取\n女名1\n女名2\n女名3\n", encoding='utf-8')
+            _atomic_write_bytes(cls.G_NAMES_FILE, "#以井号开头的行不会被读取\n女名1\n女名2\n女名3\n".encode('utf-8'))
         
         # 创建多音字配置
         if not cls.NAME_CHANGES_FILE.exists():
             cls.save_name_changes({f'speak_change_{c}': '' for c in 'abc'})
     
     @classmethod
-    def load_cached(cls):
-        """带缓存的加载"""
-        if cls._config_cache is None:
-            cls._config_cache = cls._load_internal()
-        return copy.deepcopy(cls._config_cache)
+    def load_cached(cls, deep: bool = False):
+        """
+        带缓存的加载，返回可自由修改的副本
+        配置值均为 JSON 标量或名单列表，默认只复制一层并单独复制列表；deep=True 时完整深拷贝
+        """
+        pending = None
+        with cls._lock:
+            if cls._config_cache is None:
+                cls._config_cache, pending = cls._load_internal()
+            config = copy.deepcopy(cls._config_cache) if deep else cls._shallow_clone(cls._config_cache)
+        if pending is not None:
+            cls._write_prepared(*pending)
+        return config
     
     @classmethod
-    def save_atomic(cls, config: dict):
-        """保存和变更检测"""
-
-        config_copy = copy.deepcopy(config)
-        config_str = json.dumps(config_copy, ensure_ascii=False, sort_keys=True, indent=2)
-        current_hash = hashlib.sha256(config_str.encode('utf-8')).hexdigest()
+    def _shallow_clone(cls, cfg: dict) -> dict:
+        """复制配置：顶层新建字典，唯一的可变值（可抽取名单）另行复制"""
+        return {**cfg, cls.KEY_SAVED_AVAILABLE_NAMES: list(cfg.get(cls.KEY_SAVED_AVAILABLE_NAMES, []))}
+    
+    @classmethod
+    def submit_background(cls, fn, *args):
+        """将写盘任务提交到后台保存线程（单线程，按提交顺序执行），返回 Future"""
+        if cls._save_executor is None:
+            cls._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ConfigSave")
+        cls._last_save_future = cls._save_executor.submit(fn, *args)
+        return cls._last_save_future
+    
+    @classmethod
+    def shutdown_background_saves(cls):
+        """等待后台保存完成并关闭保存线程（退出前调用）"""
+        if cls._save_executor is not None:
+            cls._save_executor.shutdown(wait=True)
+            cls._save_executor = None
+            cls._last_save_future = None
+    
+    @classmethod
+    def current_revision(cls):
+        """当前缓存配置的修订号（每次写盘递增）；缓存尚未加载时返回 None，不触发读盘"""
+        with cls._lock:
+            if cls._config_cache is None:
+                return None
+            return cls._config_cache.get(cls.KEY_INTERNAL_REVISION, 0)
+    
+    @classmethod
+    def save_atomic(cls, config: dict, extra_updates: dict = None, already_owned: bool = False):
+        """
+        保存和变更检测（extra_updates 合并到副本后随同一次写入）
+        already_owned=True 表示 config 是调用方新建且不再使用的字典，直接接管为缓存，省去深拷贝
+        """
+        with cls._lock:
+            pending = cls._prepare_save(config, extra_updates, already_owned)
+        if pending is not None:
+            cls._write_prepared(*pending)
+    
+    @classmethod
+    def _prepare_save(cls, config: dict, extra_updates: dict = None, already_owned: bool = False):
+        """
+        （须持锁）合并、序列化和变更检测，并更新缓存与摘要；只做内存操作
+        返回待写盘的 (序号, 修订号, 字节)，由调用方释放锁后交给 _write_prepared；无变更时返回 None
+        """
+        config_copy = config if already_owned else copy.deepcopy(config)
+        if extra_updates:
+            config_copy.update(copy.deepcopy(extra_updates))
+        # 修订号每次写盘都会递增，不参与变更检测；摘要只用于判等，无需加密哈希
+        revision = config_copy.pop(cls.KEY_INTERNAL_REVISION, 0)
+        config_bytes = _dumps_config(config_copy)
+        current_hash = cls._digest(config_bytes)
 
         if current_hash == cls._last_save_hash:
-            print(f"[CONFIG] 配置未更改，取消保存")
-            return
-        
+            config_copy[cls.KEY_INTERNAL_REVISION] = revision  # 接管的字典需原样还给调用方
+            logger.debug("[CONFIG] 配置未更改，取消保存")
+            return None
+    
         if 'recent_bitmap' in config and isinstance(config['recent_bitmap'], bitarray):
             config['recent_bitmap'] = binascii.b2a_base64(
                 config['recent_bitmap'].tobytes()
             ).decode('ascii')
-        
-        config_copy[cls.KEY_INTERNAL_REVISION] = config_copy.get(cls.KEY_INTERNAL_REVISION, 0) + 1
-
-        config_str = json.dumps(config_copy, ensure_ascii=False, sort_keys=True, indent=2)
-        
-        tmp_file = cls.CONFIG_FILE.with_suffix('.tmp')
-        tmp_file.write_text(config_str, encoding='utf-8')
-        os.replace(str(tmp_file), str(cls.CONFIG_FILE))
+    
+        revision += 1
+        # 在已序列化、已编码的正文开头插入修订号，不再整体序列化或编码第二次
+        # 仅当正文是非空对象、且 "_revision" 排在所有键之前时（配置键均为小写），拼接结果才与 sort_keys 一致；
+        # 否则（空配置、或有大写/数字开头的键）带上修订号整体再序列化一次
+        can_splice = bool(config_copy) and min(config_copy) > cls.KEY_INTERNAL_REVISION
+        config_copy[cls.KEY_INTERNAL_REVISION] = revision
+        if can_splice:
+            header = f'{{\n  "{cls.KEY_INTERNAL_REVISION}": {revision},'.encode('utf-8')
+            data = header + config_bytes[1:]
+        else:
+            data = _dumps_config(config_copy)
 
         cls._config_cache = config_copy
-        cls._last_save_hash = hashlib.sha256(config_str.encode('utf-8')).hexdigest()
-        print(f"[CONFIG] 配置已保存，修订号: {config_copy[cls.KEY_INTERNAL_REVISION]}")
+        cls._last_save_hash = current_hash
+        cls._save_seq += 1
+        return cls._save_seq, revision, data
+    
+    @classmethod
+    def _write_prepared(cls, seq: int, revision: int, data: bytes):
+        """
+        写盘（须在 _lock 之外调用，fsync 期间其它线程仍可读写缓存）
+        各线程的写盘按序号串行：较新的快照已先落盘时，较旧的快照直接丢弃
+        """
+        with cls._write_lock:
+            if seq <= cls._written_seq:
+                return
+            try:
+                _atomic_write_bytes(cls.CONFIG_FILE, data)
+            except Exception:
+                with cls._lock:
+                    cls._last_save_hash = None  # 磁盘内容落后于缓存，下次保存不可跳过
+                raise
+            cls._written_seq = seq
+        logger.debug("[CONFIG] 配置已保存，修订号: %s", revision)
+    
+    @staticmethod
+    def _digest(config_bytes: bytes) -> bytes:
+        """变更检测用摘要（只用于判等，无需加密哈希）"""
+        return hashlib.blake2b(config_bytes, digest_size=16).digest()
+    
+    @classmethod
+    def save_patch(cls, updates: dict):
+        """只提交变更字段：合并到缓存配置后一次写入；无变更时不写入"""
+        if not updates:
+            return
+        
+        with cls._lock:
+            pending = cls._prepare_patch(updates)
+        if pending is not None:
+            cls._write_prepared(*pending)
+    
+    @classmethod
+    def save_patch_background(cls, updates: dict):
+        """
+        同 save_patch，但写盘交给后台保存线程，返回 Future；无需写盘时返回 None
+        合并与序列化在调用线程完成（仅内存操作），变更提交时即已进入缓存，
+        之后的读取和同步保存都能看到，不会被稍后才执行的后台写盘覆盖
+        """
+        if not updates:
+            return None
+        
+        with cls._lock:
+            pending = cls._prepare_patch(updates)
+        if pending is None:
+            return None
+        return cls.submit_background(cls._write_prepared, *pending)
+    
+    @classmethod
+    def _prepare_patch(cls, updates: dict):
+        """（须持锁）把变更字段合并到缓存配置，返回待写盘内容（同 _prepare_save）"""
+        migrated = None
+        if cls._config_cache is None:
+            cls._config_cache, migrated = cls._load_internal()
+        # _prepare_save 内部会复制，直接传入缓存本体，省去一次深拷贝
+        # 本次写盘内容已包含迁移结果且序号更新，有变更时无需再写迁移版本
+        return cls._prepare_save(cls._config_cache, extra_updates=updates) or migrated
     
     @classmethod
     def _load_internal(cls):
-        """内部加载"""
+        """
+        内部加载（须持锁），返回 (配置, 待写盘内容)
+        版本迁移需要写回时后者非 None，由调用方释放锁后交给 _write_prepared
+        """
         try:
-            text = cls.CONFIG_FILE.read_text(encoding='utf-8')
-            config = json.loads(text)
-            # 版本迁移
-            config = {**cls.DEFAULT_CONFIG, **config}
-            cls.save_atomic(config)
-            return config
+            config = _loads_config(cls.CONFIG_FILE.read_bytes())
+            # 版本迁移：只有补入了新的默认键时才需要写回，否则启动时不写盘
+            if cls.DEFAULT_CONFIG.keys() - config.keys():
+                config = {**cls.DEFAULT_CONFIG, **config}
+                return config, cls._prepare_save(config, already_owned=True)
+            # 记下磁盘内容的摘要（与 save_atomic 同样不含修订号），后续无变更的保存可直接跳过
+            content = {k: v for k, v in config.items() if k != cls.KEY_INTERNAL_REVISION}
+            cls._last_save_hash = cls._digest(_dumps_config(content))
+            return config, None
         except Exception:
-            return cls.DEFAULT_CONFIG.copy()
+            return cls.DEFAULT_CONFIG.copy(), None
     
     @classmethod
     def get_name_count(cls):
-        """获取总名单人数（从 ConfigPage 移入）"""
+        """获取总名单人数（从 ConfigPage 移入；文件未修改时直接返回缓存，不重新读取）"""
         try:
-            return sum(1 for line in cls.NAMES_FILE.read_text(encoding='utf-8-sig').splitlines() 
-                      if line.strip() and not line.strip().startswith('#'))
+            st = cls.NAMES_FILE.stat()
+            stamp = (st.st_mtime_ns, st.st_size)  # 粗精度 mtime（FAT/exFAT）下同时比较大小
+            if cls._name_count_cache is not None and cls._name_count_cache[0] == stamp:
+                return cls._name_count_cache[1]
+            # 与主程序 _parse_student_file 同一口径：按 \n 切分、strip 后跳过空行和注释
+            raw = cls.NAMES_FILE.read_text(encoding='utf-8-sig')
+            count = sum(1 for s in (line.strip() for line in raw.split('\n')) if s and s[0] != '#')
+            cls._name_count_cache = (stamp, count)
+            return count
         except Exception:
             return 1
     
     @classmethod
     def save_name_changes(cls, data):
         """保存多音字配置"""
-        cls.NAME_CHANGES_FILE.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+        _atomic_write_bytes(cls.NAME_CHANGES_FILE, json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8'))
     
     @classmethod
     def load_name_changes(cls):
@@ -196,11 +383,9 @@ class ConfigManager:
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         
         try:
-            # 读取数据
-            all_names = {line.strip() for line in cls.NAMES_FILE.read_text(encoding='utf-8').splitlines() 
-                        if line.strip() and not line.startswith('#')}
-            g_names = {line.strip() for line in cls.G_NAMES_FILE.read_text(encoding='utf-8').splitlines() 
-                      if line.strip() and not line.startswith('#')}
+            # 读取数据（每个文件只读一次）
+            all_names = cls._read_name_set(cls.NAMES_FILE)
+            g_names = cls._read_name_set(cls.G_NAMES_FILE)
             
             invalid = g_names - all_names
             if not invalid:
@@ -208,24 +393,33 @@ class ConfigManager:
             
             # 2. 执行修复（带备份）
             if fix_type == 'add_to_all':
-                # 使用pathlib备份
-                backup_path = backup_dir / f"names_backup_{timestamp}.txt"
-                backup_path.write_bytes(cls.NAMES_FILE.read_bytes())
-                
-                # 修改文件
-                valid = all_names | invalid
-                cls.NAMES_FILE.write_text('\n'.join(['#以井号开头的行不会被读取'] + sorted(valid)), encoding='utf-8')
+                cls._replace_name_file(cls.NAMES_FILE, all_names | invalid,
+                                       backup_dir / f"names_backup_{timestamp}.txt")
                 return True, f"已添加 {len(invalid)} 个名字到总名单"
             
             else:  # 'remove_from_girl'
-                # 使用pathlib备份
-                backup_path = backup_dir / f"g_names_backup_{timestamp}.txt"
-                backup_path.write_bytes(cls.G_NAMES_FILE.read_bytes())
-                
-                # 修改文件
-                valid = g_names & all_names
-                cls.G_NAMES_FILE.write_text('\n'.join(['#以井号开头的行不会被读取'] + sorted(valid)), encoding='utf-8')
+                cls._replace_name_file(cls.G_NAMES_FILE, g_names & all_names,
+                                       backup_dir / f"g_names_backup_{timestamp}.txt")
                 return True, f"已从女生名单删除 {len(invalid)} 个无效名字"
                 
         except Exception as e:
-            return False, f"修复失败: {str(e)}"
\ No newline at end of file
+            return False, f"修复失败: {str(e)}"
+    
+    @staticmethod
+    def _read_name_set(path: Path) -> set:
+        """一次读入名单文件为集合（跳过空行和 # 注释行）"""
+        names = (line.strip() for line in path.read_bytes().decode('utf-8-sig').splitlines())
+        return {name for name in names if name and name[0] != '#'}
+    
+    @staticmethod
+    def _replace_name_file(path: Path, names: set, backup_path: Path):
+        """
+        备份后整体替换名单文件
+        备份优先用硬链接（不读写文件内容），新内容写入临时文件后原子替换，旧数据留在备份链接上
+        """
+        try:
+            os.link(path, backup_path)
+        except OSError:
+            shutil.copyfile(path, backup_path)  # 文件系统不支持硬链接时退回复制
+        
+        _atomic_write_bytes(path, '\n'.join(['#以井号开头的行不会被读取', *sorted(names)]).encode('utf-8'))
\ No newline at end of file
@@ -19,11 +19,13 @@ class SingleInstanceManager(QObject):
         socket = QLocalSocket()
         socket.connectToServer(self.app_name)
         
-        if socket.waitForConnected(500):
+        # 本机连接：服务端不存在时会立即失败，存在时也很快连上，无需长时间等待
+        if socket.waitForConnected(100):
             print(f"[SINGLE] 检测到已有实例，发送激活请求...")
             socket.write(QByteArray(b"SHOW_WINDOW"))
-            socket.flush()
-            socket.waitForBytesWritten(1000)
+            # 本机管道通常 flush 即写完；仍有未写出的数据时才短暂等待，保证进程退出前送达
+            if not socket.flush() or socket.bytesToWrite():
+                socket.waitForBytesWritten(200)
             socket.disconnectFromServer()
             return True
         
@@ -53,7 +55,8 @@ class SingleInstanceManager(QObject):
         if not socket:
             return
         
-        if socket.waitForReadyRead(1000):
+        # 对方连上后立即写入，短超时即可，避免阻塞界面线程
+        if socket.bytesAvailable() or socket.waitForReadyRead(200):
             data = socket.readAll().data().decode('utf-8').strip()
             print(f"[SINGLE] 收到其他实例命令: {data}")
             
@@ -1,9 +1,13 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Set, List
-from collections import deque
+from typing import Set, List, Sequence
+from array import array
 import random
 from bitarray import bitarray
+from bitarray.util import count_n
+
+# search() 的查找模式：置位位（模块级常量，免去每次调用重新构造）
+_ONE = bitarray('1')
 
 class Gender(Enum):
     MALE = "male"
@@ -16,10 +20,14 @@ class Student:
     display_name: str
     gender: Gender
     
-    __slots__ = ('original_name', 'display_name', 'gender')  # 保持内存优化
+    __slots__ = ('original_name', 'display_name', 'gender', '_hash')  # 保持内存优化
+
+    def __post_init__(self):
+        # 相等性只看原名（显示名可能经多音字替换），哈希值随之在构造时算好
+        object.__setattr__(self, '_hash', hash(self.original_name))
 
     def __hash__(self):
-        return hash(self.original_name)
+        return self._hash
     
     def __eq__(self, other):
         return isinstance(other, Student) and self.original_name == other.original_name
@@ -30,15 +38,22 @@ class StudentPool:
         '_students',           # List[Student]: 只读学生列表（按索引存储）
         '_name_to_idx',        # Dict[str, int]: 名字到索引的映射
         '_female_bitmap',      # bitarray: 女生标记位图 (0->男, 1->女)
+        '_male_bitmap',        # bitarray: 女生位图的补集（构造后不变，预先计算）
         '_bit_available',      # BitArray: 可用状态位图
         '_bit_picked',         # BitArray: 已抽取状态位图
+        '_cand_female',        # bitarray: 可用且为女生（随 _bit_available 增量维护）
+        '_cand_male',          # bitarray: 可用且为男生（随 _bit_available 增量维护）
+        '_scratch',            # bitarray: 排除最近抽取时复用的临时位图
+        '_gender_masks',       # Dict[Gender, bitarray]: 性别 → 性别位图（不含 UNKNOWN）
+        '_candidates_by_gender',  # Dict[Gender, bitarray]: 性别 → 候选位图（均为原地维护的缓存本体）
         '_no_duplicate',       # int: 防重复次数
-        '_recent_bitmap',      # bitarray: 最近抽取标记（替代deque）
-        '_recent_queue'        # deque[int]: 最近抽取索引队列
+        '_ring',               # array('i'): 最近抽取索引环形缓冲（-1 表示空位）
+        '_ring_head'           # int: 环形缓冲下一个写入位置（即最旧的一项）
     )
 
 
-    def __init__(self, all_students: List[Student], female_students: List[Student], no_duplicate: int = 0):
+    def __init__(self, all_students: List[Student], female_students: List[Student], no_duplicate: int = 0,
+                 recent: Sequence[int] = None):
         if not all_students:
             raise ValueError("学生名单不能为空")
         
@@ -54,6 +69,7 @@ class StudentPool:
         for s in female_students:
             if s.original_name in self._name_to_idx:
                 self._female_bitmap[self._name_to_idx[s.original_name]] = 1
+        self._male_bitmap = ~self._female_bitmap
         
         # 3. 位图状态
         # 使用bitarray
@@ -61,21 +77,55 @@ class StudentPool:
         self._bit_available.setall(True)  # 初始全可用
         self._bit_picked = bitarray(total)
         self._bit_picked.setall(False)    # 初始全未抽取
+        self._scratch = bitarray(total)
+        self._cand_female = bitarray(total)
+        self._cand_male = bitarray(total)
+        self._rebuild_candidates()
+        
+        # 性别分支改为一次字典查找（位图对象始终原地更新，映射无需重建）
+        self._gender_masks = {Gender.FEMALE: self._female_bitmap, Gender.MALE: self._male_bitmap}
+        self._candidates_by_gender = {
+            Gender.UNKNOWN: self._bit_available,
+            Gender.FEMALE: self._cand_female,
+            Gender.MALE: self._cand_male,
+        }
         
-        # 4. 防重复队列（存储索引而非字符串,用bitarray优化查找）
+        # 4. 防重复环形缓冲（存储索引；防重复次数通常很小，线性扫描比维护整张位图更省）
+        #    recent: 继承的最近抽取索引（旧 → 新），超出名单范围的索引丢弃
         self._no_duplicate = max(0, no_duplicate)
-        self._recent_queue = deque(maxlen=no_duplicate if no_duplicate > 0 else None)
-        self._recent_bitmap = bitarray(total)
-        self._recent_bitmap.setall(False)
+        self._reset_ring(i for i in (recent or ()) if 0 <= i < total)
+
+    def _reset_ring(self, recent=()):
+        """按当前防重复次数重建环形缓冲，并依次写入 recent（旧 → 新，只保留最后 n 个）"""
+        self._ring = array('i', [-1]) * self._no_duplicate
+        self._ring_head = 0
+        for idx in recent:
+            self._push_recent(idx)
+
+    def _push_recent(self, idx: int):
+        """写入一次抽取：覆盖最旧的一项，无需额外清理"""
+        if self._no_duplicate > 0:
+            self._ring[self._ring_head] = idx
+            self._ring_head = (self._ring_head + 1) % self._no_duplicate
+
+    def get_recent_indices(self) -> List[int]:
+        """最近抽取的索引（旧 → 新），用于重建学生池时移交防重复状态"""
+        head = self._ring_head
+        return [idx for idx in self._ring[head:] + self._ring[:head] if idx >= 0]
 
     def pick(self, gender: Gender = Gender.UNKNOWN, remove: bool = True) -> str:
         """抽取学生（位图优化版：避免构建完整列表）"""
-        # 1. 获取候选位图（保持原有逻辑）
+        # 1. 获取候选位图（缓存本体，只读）
         candidates = self._get_candidate_bitmap(gender)
         
-        # 2. 排除最近抽取（位图减法）
+        # 2. 排除最近抽取（在复用的临时位图上逐个清位）
         if self._no_duplicate > 0:
-            candidates &= ~self._recent_bitmap
+            scratch = self._scratch
+            scratch[:] = candidates
+            for idx in self._ring:
+                if idx >= 0:
+                    scratch[idx] = False
+            candidates = scratch
         
         # 3. 统计可用数量
         available_count = candidates.count(True)
@@ -85,30 +135,19 @@ class StudentPool:
         # 4. 随机选择第 k 个（0-indexed），无需构建列表
         target = random.randint(0, available_count - 1)
         
-        # 5. 直接遍历找到第 target 个置位位（O(n) 但无内存分配）
-        # 使用 enumerate + 计数器，比 itersearch 更快（避免迭代器开销）
-        count = 0
-        for idx, is_available in enumerate(candidates):
-            if is_available:
-                if count == target:
-                    picked_idx = idx
-                    break
-                count += 1
+        # 5. 定位第 target 个置位位：count_n 在 C 层按字计数，无需逐位遍历
+        picked_idx = count_n(candidates, target + 1) - 1
         
         # 6. 更新状态
         if remove:
             self._bit_available[picked_idx] = False
             self._bit_picked[picked_idx] = True
+            # 候选缓存只需翻转这一位（其中一个本就为 0）
+            self._cand_female[picked_idx] = False
+            self._cand_male[picked_idx] = False
         
-        # 7. 优化防重复位图更新（避免全清重设）
-        if self._no_duplicate > 0:
-            if len(self._recent_queue) >= self._no_duplicate:
-                # 队列满时，只清除最旧的一个，而非全部重建
-                oldest_idx = self._recent_queue.popleft()
-                self._recent_bitmap[oldest_idx] = False
-            
-            self._recent_queue.append(picked_idx)
-            self._recent_bitmap[picked_idx] = True
+        # 7. 记录到防重复环形缓冲（覆盖最旧一项）
+        self._push_recent(picked_idx)
         
         return self._students[picked_idx].display_name
 
@@ -119,37 +158,44 @@ class StudentPool:
             self._bit_picked.setall(False)
         else:
             # 按性别重置（位图条件赋值）
-            mask = self._female_bitmap if gender == Gender.FEMALE else ~self._female_bitmap
+            if gender == Gender.FEMALE:
+                mask, other = self._female_bitmap, self._male_bitmap
+            else:
+                mask, other = self._male_bitmap, self._female_bitmap
             self._bit_available |= mask
-            self._bit_picked &= ~mask
+            self._bit_picked &= other  # 即 &= ~mask
+        self._rebuild_candidates()
         
         # 清空防重复
-        self._recent_queue.clear()
-        self._recent_bitmap.setall(False)
+        self._reset_ring()
     
     ### ===== 数据导出/恢复接口 =====
     
-    def get_available_names(self) -> Set[str]:
-        """获取可用名字集合（用于保存）"""
-        return {self._students[i].original_name for i in range(len(self._students)) if self._bit_available[i]}
+    def get_available_names(self) -> List[str]:
+        """获取可用名字列表（按名单顺序，顺序固定便于直接比较；用于保存）"""
+        students = self._students
+        return [students[i].original_name for i in self._bit_available.search(_ONE)]
 
     def get_picked_names(self) -> Set[str]:
         """获取已抽取名字集合（用于重建）"""
-        return {self._students[i].original_name for i in range(len(self._students)) if self._bit_picked[i]}
+        students = self._students
+        return {students[i].original_name for i in self._bit_picked.search(_ONE)}
 
     def restore_available_names(self, names: Set[str]):
         """从历史名单恢复位图状态（配置加载）"""
-        # 先设为全不可用（相当于全部已抽取）
-        self._bit_available.setall(False)
-        self._bit_picked.setall(True)
-        
-        # 将传入的可用名单恢复为可用状态
+        # 先设为全不可用，再把传入的可用名单逐位置位（每个名字只查一次字典）
+        available = self._bit_available
+        available.setall(False)
         if names:
-            for name in names:
-                idx = self._name_to_idx.get(name)
+            lookup = self._name_to_idx.get
+            for idx in map(lookup, names):
                 if idx is not None:
-                    self._bit_available[idx] = True
-                    self._bit_picked[idx] = False
+                    available[idx] = True
+        
+        # 已抽取即可用的补集：原地复制后整体取反，无需逐位同步
+        self._bit_picked[:] = available
+        self._bit_picked.invert()
+        self._rebuild_candidates()
 
     ### ===== 数据访问接口 =====
     
@@ -159,7 +205,24 @@ class StudentPool:
     
     def get_female_students(self) -> List[Student]:
         """获取女生对象列表"""
-        return [self._students[idx] for idx in self._female_bitmap.search(bitarray('1'))]
+        return [self._students[idx] for idx in self._female_bitmap.search(_ONE)]
+
+    def sample_candidate_indices(self, gender: Gender, k: int) -> List[int]:
+        """
+        无放回随机抽取至多 k 个候选索引
+        候选数不超过 k 时直接返回全部；否则只抽取名次，再用 count_n 定位第 n 个置位，
+        不必展开完整的候选索引列表
+        """
+        candidates = self._get_candidate_bitmap(gender)
+        available_count = candidates.count(True)
+        if available_count <= k:
+            return list(candidates.search(_ONE))
+        # range 作为总体时 random.sample 不会复制出整个列表
+        return [count_n(candidates, rank + 1) - 1 for rank in random.sample(range(available_count), k)]
+
+    def find_unknown_names(self, students: List[Student]) -> Set[str]:
+        """找出不在总名单中的名字（用于校验女生名单）"""
+        return {s.original_name for s in students if s.original_name not in self._name_to_idx}
 
     def get_student_by_name(self, name: str) -> Student:
         """通过名字获取学生对象"""
@@ -173,10 +236,10 @@ class StudentPool:
             available = self._bit_available.count(True)
             picked = self._bit_picked.count(True)
         else:
-            # 按性别统计（位图与运算后计数）
-            gender_mask = self._female_bitmap if gender == Gender.FEMALE else ~self._female_bitmap
+            # 按性别统计（可用数直接取候选缓存）
+            gender_mask = self._gender_masks[gender]
             total = gender_mask.count(True)
-            available = (self._bit_available & gender_mask).count(True)
+            available = self._candidates_by_gender[gender].count(True)
             picked = (self._bit_picked & gender_mask).count(True)
         
         return total, available, picked
@@ -184,15 +247,15 @@ class StudentPool:
     ### ===== 内部辅助方法 =====
         
     def _get_candidate_bitmap(self, gender: Gender) -> bitarray:
-        """获取候选位图（位图运算）"""
-        if gender == Gender.UNKNOWN:
-            return self._bit_available.copy()
-        
-        # 按性别过滤（位图与运算）
-        if gender == Gender.FEMALE:
-            return self._bit_available & self._female_bitmap
-        else:  # MALE
-            return self._bit_available & ~self._female_bitmap
+        """获取候选位图（返回缓存本体，调用方不得修改）"""
+        return self._candidates_by_gender[gender]
+    
+    def _rebuild_candidates(self):
+        """按当前可用位图原地重建分性别候选缓存（批量修改 _bit_available 后调用）"""
+        self._cand_female[:] = self._bit_available
+        self._cand_female &= self._female_bitmap
+        self._cand_male[:] = self._bit_available
+        self._cand_male &= self._male_bitmap
     
     ### ===== 属性访问器 =====
     
@@ -203,18 +266,7 @@ class StudentPool:
     @no_duplicate.setter
     def no_duplicate(self, value: int):
         """动态修改防重复次数"""
+        # 保留最近的抽取记录，按新长度重建环形缓冲
+        recent = self.get_recent_indices()
         self._no_duplicate = max(0, value)
-        
-        # 重建队列
-        if self._no_duplicate > 0:
-            current = list(self._recent_queue)
-            self._recent_queue = deque(maxlen=self._no_duplicate)
-            self._recent_queue.extend(current[-self._no_duplicate:])
-            
-            # 重建位图
-            self._recent_bitmap.setall(False)
-            for idx in self._recent_queue:
-                self._recent_bitmap[idx] = True
-        else:
-            self._recent_queue.clear()
-            self._recent_bitmap.setall(False)
\ No newline at end of file
+        self._reset_ring(recent)
\ No newline at end of file